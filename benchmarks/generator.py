@@ -0,0 +1,91 @@
+import random
+from typing import Iterator, List
+
+POS_BASE_URL = 'https://pos.gosuslugi.ru'
+REG_CODES = ['01', '16', '23', '50', '66', '77', '78', '111', '711', '7114']
+CITIES = ['Москва', 'Санкт-Петербург', 'Казань', 'Екатеринбург', 'Новосибирск', 'Краснодар']
+ACTIVITIES = ['Государственная организация', 'Образование', 'Культура', 'Здоровье', 'Спорт']
+
+
+def generate_pos_url(rnd: random.Random, group_id: int) -> str:
+    kind = rnd.choices(['form', 'roiv', 'omsu'], weights=[6, 2, 2])[0]
+    reg_code = rnd.choice(REG_CODES)
+    ogrn = f'{rnd.randrange(10 ** 12, 10 ** 13)}'
+    if kind == 'form':
+        url = f'{POS_BASE_URL}/form/?opaId={group_id % 500000}&utm_source=vk&utm_medium={reg_code}&utm_campaign={ogrn}'
+    elif kind == 'roiv':
+        url = f'{POS_BASE_URL}/og/org-activities?reg_code={reg_code}&utm_source=vk1&utm_medium={reg_code}' \
+              f'&utm_campaign={ogrn}'
+    else:
+        url = f'{POS_BASE_URL}/og/org-activities?mun_code={rnd.randrange(10 ** 7, 10 ** 8)}&utm_source=vk2' \
+              f'&utm_medium={reg_code}&utm_campaign={ogrn}'
+
+    defect = rnd.random()
+    if defect < .08:
+        url = url.replace('utm_campaign=', 'utm_campaign=0')
+    elif defect < .12:
+        url = url.replace('&utm_medium', ' &utm_medium')
+    elif defect < .16:
+        url = url.replace('utm_source=vk', 'utm_source=vk3')
+    elif defect < .18:
+        url += '&utm_content=widget'
+    return url
+
+
+def generate_menu(rnd: random.Random, group_id: int) -> dict:
+    items = []
+    for i in range(rnd.choices([0, 1, 2, 3, 4], weights=[2, 2, 10, 2, 1])[0]):
+        if rnd.random() < .85:
+            url = generate_pos_url(rnd, group_id)
+            title = rnd.choice(['Госуслуги', 'Решаем вместе', 'Обратная связь'])
+        else:
+            url = f'https://vk.com/app{rnd.randrange(10 ** 6, 10 ** 7)}_-{group_id}'
+            title = 'Приложение'
+        items.append({
+            'id': i + 1,
+            'url': url,
+            'title': title,
+            'type': 'link',
+            'cover': {'images': [{'url': f'https://sun.userapi.com/{group_id}_{i}.jpg', 'width': 160, 'height': 160}]}
+        })
+    return {'items': items}
+
+
+def generate_public_data(group_id: int, rnd: random.Random = None) -> dict:
+    rnd = rnd if rnd else random.Random(group_id)
+    screen_name = f'club{group_id}' if rnd.random() < .6 else f'public_name_{group_id}'
+    city = rnd.choice(CITIES)
+    data = {
+        'id': group_id,
+        'name': f'Администрация учреждения №{group_id}',
+        'screen_name': screen_name,
+        'is_closed': 0,
+        'type': 'page',
+        'is_government_organization': rnd.random() < .7,
+        'activity': rnd.choice(ACTIVITIES),
+        'city': {'id': CITIES.index(city) + 1, 'title': city},
+        'members_count': rnd.randrange(10, 100000),
+        'status': 'Официальная страница',
+        'description': 'Официальное сообщество. ' * rnd.randrange(1, 20),
+        'addresses': {
+            'is_enabled': True,
+            'main_address_id': group_id,
+            'main_address': {'id': group_id, 'address': f'ул. Ленина, д. {group_id % 100}',
+                             'city': {'id': CITIES.index(city) + 1, 'title': city}}
+        },
+        'contacts': [{'user_id': rnd.randrange(1, 10 ** 9), 'desc': 'Пресс-служба'}],
+    }
+    menu = generate_menu(rnd, group_id)
+    if menu['items'] or rnd.random() < .5:
+        data['menu'] = menu
+    return data
+
+
+def generate_publics_data(count: int, seed: int = 0) -> Iterator[dict]:
+    rnd = random.Random(seed)
+    for group_id in range(1, count + 1):
+        yield generate_public_data(group_id, rnd)
+
+
+def generate_urls(publics_data: List[dict]) -> List[str]:
+    return [f'https://vk.com/{data["screen_name"]}' for data in publics_data]
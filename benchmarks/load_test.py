@@ -0,0 +1,120 @@
+import argparse
+import contextlib
+import json
+import sys
+import time
+from typing import Dict, List
+
+from benchmarks.generator import generate_publics_data, generate_urls
+from benchmarks.vk_server import VkApiStub
+from configs import CONFIG, setup_logging
+from finder import Public
+from helpers import override
+from main import WidgetFinder
+
+
+def get_percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    values = sorted(values)
+    percentiles = {
+        f'p{percentile}': round(values[min(int(len(values) * percentile / 100), len(values) - 1)], 6)
+        for percentile in (50, 90, 99)
+    }
+    percentiles['max'] = round(values[-1], 6)
+    return percentiles
+
+
+def run_load_test(count: int, seed: int = 0, server_options: dict = None, **vk_api_options) -> dict:
+    publics_data = list(generate_publics_data(count, seed))
+    urls = generate_urls(publics_data)
+    latencies = []
+
+    with VkApiStub(publics_data, seed=seed, **(server_options or {})) as server, \
+            override(CONFIG.vk_api, **vk_api_options), \
+            override(CONFIG.parsing, journal=False, incremental=False, resolve_ids=False, save_public_data=False), \
+            override(CONFIG.cache, enabled=False):
+        vk_api_settings = dict(
+            workers=CONFIG.vk_api.workers,
+            requests_per_second=CONFIG.vk_api.requests_per_second,
+            execute_batch_size=CONFIG.vk_api.execute_batch_size,
+        )
+        vk_api_settings['tokens'] = len(CONFIG.vk_api.access_tokens)
+        finder = WidgetFinder()
+        for api in finder.apis:
+            api._api.API_URL = server.url
+            api._api.session.hooks['response'].append(
+                lambda response, *args, **kwargs: latencies.append(response.elapsed.total_seconds())
+            )
+        finder.urls = set(urls)
+        finder.publics = {url: Public(url) for url in urls}
+
+        error = None
+        started = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(sys.stderr):
+                finder.process_publics()
+        except SystemExit as e:
+            error = str(e)
+        elapsed = time.perf_counter() - started
+        stats = dict(server.stats)
+        counters = finder.metrics.to_dict()['counters']
+
+    return dict(
+        count=count,
+        vk_api=vk_api_settings,
+        server=server_options or {},
+        seconds=round(elapsed, 6),
+        urls_per_second=round(count / elapsed, 1) if elapsed else None,
+        processed=sum(1 for public in finder.publics.values() if public.data),
+        retries=counters.get('retries', 0),
+        latency=get_percentiles(latencies),
+        stats=stats,
+        counters=counters,
+        error=error,
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='End-to-end load test of WidgetFinder against the local VK API stand-in')
+    parser.add_argument('-n', '--count', type=int, nargs='+', default=[10000],
+                        help='numbers of input urls, e.g. -n 1000 10000 100000')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, help='overrides vk_api.workers')
+    parser.add_argument('--rps', type=float, help='overrides vk_api.requests_per_second')
+    parser.add_argument('--execute-batch-size', type=int, help='overrides vk_api.execute_batch_size')
+    parser.add_argument('--tokens', type=int, help='overrides vk_api.access_token with the number of fake tokens')
+    parser.add_argument('--latency', type=float, default=.05, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=.05, help='max random seconds added to the latency')
+    parser.add_argument('--connection-error-rate', type=float, default=0., help='share of dropped connections')
+    parser.add_argument('--error-rate', type=float, default=0., help='share of responses with VK API error')
+    parser.add_argument('--error-code', type=int, default=6, help='code of injected VK API errors')
+    parser.add_argument('--no-compression', action='store_true', help='make the stand-in ignore Accept-Encoding: gzip')
+    parser.add_argument('-o', '--output', help='write the JSON report to the file instead of stdout')
+    args = parser.parse_args()
+    setup_logging()
+
+    options = dict(
+        workers=args.workers,
+        requests_per_second=args.rps,
+        execute_batch_size=args.execute_batch_size,
+        access_tokens=[f'token{i}' for i in range(args.tokens)] if args.tokens else None,
+    )
+    server_options = dict(
+        latency=args.latency,
+        jitter=args.jitter,
+        connection_error_rate=args.connection_error_rate,
+        error_rate=args.error_rate,
+        error_code=args.error_code,
+        compression=not args.no_compression,
+    )
+    report = [
+        run_load_test(count, args.seed, server_options, **{k: v for k, v in options.items() if v is not None})
+        for count in args.count
+    ]
+
+    if args.output:
+        with open(args.output, encoding='utf8', mode='w') as f:
+            json.dump(report, f, indent=4)
+    else:
+        print(json.dumps(report, indent=4))
@@ -0,0 +1,33 @@
+import argparse
+import json
+import tracemalloc
+
+from benchmarks.generator import generate_publics_data
+from finder import Public
+
+
+def measure(count: int, seed: int = 0) -> dict:
+    publics_data = list(generate_publics_data(count, seed))
+    urls = [f'https://vk.com/{data["screen_name"]}' for data in publics_data]
+
+    tracemalloc.start()
+    publics = []
+    for url, data in zip(urls, publics_data):
+        publics.append(Public(url).parse(data))
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return dict(
+        publics=len(publics),
+        pos_urls=sum(len(public.pos_widget.urls) for public in publics),
+        bytes_per_public=round(current / count, 1),
+        peak_bytes_per_public=round(peak / count, 1),
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Memory used by parsed publics, without the raw VK data')
+    parser.add_argument('-n', '--count', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(measure(args.count, args.seed), indent=4))
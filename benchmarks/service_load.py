@@ -0,0 +1,124 @@
+import argparse
+import contextlib
+import http.client
+import json
+import sys
+import threading
+import time
+from urllib.parse import quote, urlparse
+
+from benchmarks.generator import generate_publics_data, generate_urls
+from benchmarks.load_test import get_percentiles
+from benchmarks.vk_server import VkApiStub
+from configs import CONFIG, setup_logging
+from finder.service import create_service, run_service
+from helpers import override, split_list
+from main import WidgetFinder
+
+
+def run_service_load(
+        count: int,
+        clients: int = 100,
+        repeat: int = 1,
+        seed: int = 0,
+        server_options: dict = None,
+        **service_options
+) -> dict:
+    publics_data = list(generate_publics_data(count, seed))
+    urls = generate_urls(publics_data)
+    latencies = []
+    errors = []
+
+    def send_requests(client_urls):
+        connection = http.client.HTTPConnection(host, port, timeout=CONFIG.service.timeout)
+        for url in client_urls * repeat:
+            started = time.perf_counter()
+            connection.request('GET', f'/validate?url={quote(url)}')
+            response = connection.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - started)
+            if response.status != 200:
+                errors.append(response.status)
+        connection.close()
+
+    with VkApiStub(publics_data, seed=seed, **(server_options or {})) as stub, \
+            override(CONFIG.parsing, journal=False, incremental=False, resolve_ids=False, save_public_data=False), \
+            override(CONFIG.cache, enabled=False), \
+            override(CONFIG.service, host='127.0.0.1', port=0, **service_options):
+        service_settings = dict(
+            batch_size=CONFIG.service.batch_size,
+            batch_window=CONFIG.service.batch_window,
+            cache_ttl=CONFIG.service.cache_ttl,
+        )
+        finder = WidgetFinder()
+        for api in finder.apis:
+            api._api.API_URL = stub.url
+        server = create_service(finder)
+        host, port = urlparse(server.url).hostname, urlparse(server.url).port
+
+        with contextlib.redirect_stdout(sys.stderr):
+            service = threading.Thread(target=run_service, args=(finder, server), name='validation-service')
+            service.start()
+            threads = [
+                threading.Thread(target=send_requests, args=(client_urls,))
+                for client_urls in split_list(urls, max(-(-len(urls) // clients), 1))
+            ]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+            server.batcher.stop()
+            service.join()
+        stats = dict(stub.stats)
+        counters = finder.metrics.to_dict()['counters']
+
+    return dict(
+        count=count,
+        clients=len(threads),
+        repeat=repeat,
+        service=service_settings,
+        server=server_options or {},
+        seconds=round(elapsed, 6),
+        requests_per_second=round(len(latencies) / elapsed, 1) if elapsed else None,
+        latency=get_percentiles(latencies),
+        api_requests=stats.get('requests', 0),
+        min_api_requests=finder.get_requests_count(count),
+        errors=len(errors),
+        counters=counters,
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Load test of the validation service: concurrent single-url requests against the VK API stand-in'
+    )
+    parser.add_argument('-n', '--count', type=int, nargs='+', default=[1000], help='numbers of unique urls')
+    parser.add_argument('-c', '--clients', type=int, default=100, help='number of concurrent clients')
+    parser.add_argument('--repeat', type=int, default=1, help='requests of every url, repeated ones hit the cache')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch-size', type=int, help='overrides service.batch_size')
+    parser.add_argument('--batch-window', type=float, help='overrides service.batch_window')
+    parser.add_argument('--cache-ttl', type=float, help='overrides service.cache_ttl')
+    parser.add_argument('--latency', type=float, default=.05, help='seconds added to every VK API response')
+    parser.add_argument('--jitter', type=float, default=.05, help='max random seconds added to the latency')
+    parser.add_argument('-o', '--output', help='write the JSON report to the file instead of stdout')
+    args = parser.parse_args()
+    setup_logging()
+
+    options = dict(batch_size=args.batch_size, batch_window=args.batch_window, cache_ttl=args.cache_ttl)
+    server_options = dict(latency=args.latency, jitter=args.jitter)
+    report = [
+        run_service_load(
+            count, args.clients, args.repeat, args.seed, server_options,
+            **{k: v for k, v in options.items() if v is not None}
+        )
+        for count in args.count
+    ]
+
+    if args.output:
+        with open(args.output, encoding='utf8', mode='w') as f:
+            json.dump(report, f, indent=4)
+    else:
+        print(json.dumps(report, indent=4))
@@ -0,0 +1,79 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from configs import save_config_snapshot
+
+STARTUP_BUDGET = .5
+STARTUP_CASES = {
+    'import main': [sys.executable, '-c', 'import main'],
+    'main.py --help': [sys.executable, 'main.py', '--help'],
+}
+
+
+def measure_startup(command: List[str], repeat: int = 5) -> Dict[str, float]:
+    subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    timings = []
+    for _ in range(max(repeat, 1)):
+        started = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - started)
+
+    return dict(
+        min=round(min(timings), 6),
+        median=round(statistics.median(timings), 6),
+        max=round(max(timings), 6),
+    )
+
+
+def get_import_times(command: List[str], top: int = 10) -> Dict[str, float]:
+    process = subprocess.run(
+        [command[0], '-X', 'importtime', *command[1:]],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        encoding='utf-8',
+        check=True
+    )
+    modules = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if cumulative.strip().isdigit() and not name.startswith('  '):
+            modules[name.strip()] = int(cumulative) / 1e6
+    return dict(sorted(modules.items(), key=lambda item: item[1], reverse=True)[:top])
+
+
+def run_startup(repeat: int = 5, top: int = 10) -> dict:
+    return {
+        name: dict(seconds=measure_startup(command, repeat), imports=get_import_times(command, top))
+        for name, command in STARTUP_CASES.items()
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure startup time of the tool in fresh interpreters')
+    parser.add_argument('--repeat', type=int, default=5, help='runs of every case, the median is compared')
+    parser.add_argument('--top', type=int, default=10, help='number of the slowest top-level imports to report')
+    parser.add_argument('--budget', type=float, default=STARTUP_BUDGET,
+                        help='fail if the median startup of any case exceeds the budget in seconds')
+    parser.add_argument('-o', '--output', help='write the JSON report to the file instead of stdout')
+    args = parser.parse_args()
+
+    save_config_snapshot()
+    report = dict(budget=args.budget, cases=run_startup(args.repeat, args.top))
+
+    if args.output:
+        with open(args.output, encoding='utf8', mode='w') as f:
+            json.dump(report, f, indent=4)
+    else:
+        print(json.dumps(report, indent=4))
+
+    over_budget = [name for name, case in report['cases'].items() if case['seconds']['median'] > args.budget]
+    if over_budget:
+        print(f'Startup over budget of {args.budget} sec: {", ".join(over_budget)}', file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,226 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import pandas as pd
+
+from benchmarks.generator import generate_publics_data, generate_urls
+from configs import CONFIG, setup_logging
+from finder import Public, PosWidget, PosUrlsCache, PublicsArchive
+from helpers import override, split_list
+from main import WidgetFinder
+
+SAVE_FORMATS = ['csv', 'xlsx', 'json', 'jsonl', 'html', 'parquet', 'arrow']
+
+
+def measure(func: Callable[[], int], repeat: int = 1, memory: bool = True) -> dict:
+    seconds = None
+    items = 0
+    for _ in range(max(repeat, 1)):
+        started = time.perf_counter()
+        items = func()
+        elapsed = time.perf_counter() - started
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+
+    result = dict(
+        items=items,
+        seconds=round(seconds, 6),
+        items_per_second=round(items / seconds, 1) if seconds else None,
+    )
+    if memory:
+        tracemalloc.start()
+        func()
+        result['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def bench_parse_data(publics_data: List[dict], pos_urls_cache: PosUrlsCache = None) -> Callable[[], int]:
+    def run() -> int:
+        previous = PosWidget.POS_URLS_CACHE
+        PosWidget.POS_URLS_CACHE = pos_urls_cache
+        try:
+            pos_widgets = [PosWidget().parse_data(data) for data in publics_data]
+        finally:
+            PosWidget.POS_URLS_CACHE = previous
+        return len(pos_widgets)
+
+    return run
+
+
+def get_warm_pos_urls_cache(publics_data: List[dict]) -> PosUrlsCache:
+    pos_urls_cache = PosUrlsCache(max_size=max(CONFIG.pos_urls_cache.max_size, 1))
+    bench_parse_data(publics_data, pos_urls_cache)()
+    return pos_urls_cache
+
+
+def bench_validate(publics_data: List[dict]) -> Callable[[], int]:
+    prepared = []
+    for data in publics_data:
+        for item in data.get('menu', {}).get('items', []):
+            if item['url'].startswith(PosWidget.BASE_URL):
+                path, params = PosWidget.extract_url_params(item['url'])
+                prepared.append((PosWidget.get_pos_url_type(params), item['url'], path, params))
+
+    def run() -> int:
+        pos_urls = [pos_url_type(url).validate(path, params) for pos_url_type, url, path, params in prepared]
+        return len(pos_urls)
+
+    return run
+
+
+def bench_get_public(finder: WidgetFinder, publics_data: List[dict]) -> Callable[[], int]:
+    def run() -> int:
+        publics = [finder.get_public(data) for data in publics_data]
+        return len(publics)
+
+    return run
+
+
+def bench_archive(publics_data: List[dict], tmp_dir: str) -> Callable[[], int]:
+    def run() -> int:
+        path = os.path.join(tmp_dir, 'publics_data.sqlite')
+        if os.path.exists(path):
+            os.remove(path)
+        archive = PublicsArchive(path)
+        for publics_data_list in split_list(publics_data, 500):
+            archive.put_many(publics_data_list)
+        archive.close()
+        return len(publics_data)
+
+    return run
+
+
+def bench_save_results(finder: WidgetFinder, file_format: str, tmp_dir: str) -> Callable[[], int]:
+    def run() -> int:
+        finder.file_format = file_format
+        with override(CONFIG.paths, result_file=os.path.join(tmp_dir, f'result.{file_format}')), \
+                contextlib.redirect_stdout(io.StringIO()):
+            finder.save_results()
+        return len(finder.publics)
+
+    return run
+
+
+def bench_save_data(finder: WidgetFinder, df: pd.DataFrame, file_format: str, tmp_dir: str) -> Callable[[], int]:
+    def run() -> int:
+        finder.file_format = file_format
+        with override(CONFIG.paths, result_file=os.path.join(tmp_dir, f'data.{file_format}')), \
+                contextlib.redirect_stdout(io.StringIO()):
+            finder.save_data(df)
+        return len(df)
+
+    return run
+
+
+def iter_benchmarks(publics_data: List[dict], formats: List[str], tmp_dir: str) -> Iterator[Tuple[str, Callable]]:
+    urls = generate_urls(publics_data)
+    finder = WidgetFinder()
+    finder.publics = {url: Public(url) for url in urls}
+    finder.index_publics(finder.publics)
+
+    yield 'PosWidget.parse_data', bench_parse_data(publics_data)
+    yield 'PosWidget.parse_data (pos_urls_cache)', bench_parse_data(publics_data, get_warm_pos_urls_cache(publics_data))
+    yield 'PosUrl.validate', bench_validate(publics_data)
+    yield 'WidgetFinder.get_public', bench_get_public(finder, publics_data)
+    yield 'PublicsArchive.put_many', bench_archive(publics_data, tmp_dir)
+
+    for url, data in zip(urls, publics_data):
+        finder.publics[url].parse(data)
+    for file_format in formats:
+        yield f'WidgetFinder.save_results[{file_format}]', bench_save_results(finder, file_format, tmp_dir)
+
+    max_links_per_widget = finder.get_max_links_per_widget()
+    df = pd.DataFrame(
+        list(finder.get_rows(max_links_per_widget)),
+        columns=finder.get_columns(max_links_per_widget)
+    )
+    for file_format in formats:
+        yield f'WidgetFinder.save_data[{file_format}]', bench_save_data(finder, df, file_format, tmp_dir)
+
+
+def run_suite(count: int, seed: int = 0, formats: List[str] = None, repeat: int = 1, memory: bool = True) -> dict:
+    publics_data = list(generate_publics_data(count, seed))
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            override(CONFIG.parsing, resolve_ids=False, save_public_data=False):
+        for name, func in iter_benchmarks(publics_data, formats or SAVE_FORMATS, tmp_dir):
+            try:
+                results[name] = measure(func, repeat, memory)
+            except ImportError as e:
+                results[name] = dict(error=str(e))
+            print(f'{name}: {results[name]}', file=sys.stderr)
+
+    return dict(count=count, seed=seed, repeat=repeat, results=results)
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    regressions = []
+    baseline_runs = {run['count']: run['results'] for run in baseline['runs']}
+    for run in report['runs']:
+        for name, result in run['results'].items():
+            previous = baseline_runs.get(run['count'], {}).get(name)
+            if not previous or 'error' in result or 'error' in previous:
+                continue
+            if result['items_per_second'] < previous['items_per_second'] * (1 - tolerance):
+                regressions.append(
+                    f'{name} x{run["count"]}: {previous["items_per_second"]} -> {result["items_per_second"]} items/s'
+                )
+            if 'peak_memory_bytes' in result and 'peak_memory_bytes' in previous and \
+                    result['peak_memory_bytes'] > previous['peak_memory_bytes'] * (1 + tolerance):
+                regressions.append(
+                    f'{name} x{run["count"]}: {previous["peak_memory_bytes"]} -> {result["peak_memory_bytes"]} bytes'
+                )
+    return regressions
+
+
+def get_environment() -> Dict[str, str]:
+    return dict(
+        date=datetime.now().isoformat(timespec='seconds'),
+        python=platform.python_version(),
+        platform=platform.platform(),
+        pandas=pd.__version__,
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Throughput and peak memory of the validation, parsing and export')
+    parser.add_argument('-n', '--count', type=int, nargs='+', default=[10000],
+                        help='numbers of generated publics, e.g. -n 10000 100000 1000000')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1, help='best time of several runs is reported')
+    parser.add_argument('--formats', nargs='+', default=SAVE_FORMATS, choices=SAVE_FORMATS)
+    parser.add_argument('--no-memory', action='store_true', help='skip the extra run measuring peak memory')
+    parser.add_argument('-o', '--output', help='write the JSON report to the file instead of stdout')
+    parser.add_argument('--baseline', help='JSON report of a previous version to compare with')
+    parser.add_argument('--tolerance', type=float, default=.2, help='allowed relative slowdown against baseline')
+    args = parser.parse_args()
+    setup_logging()
+
+    report = dict(
+        environment=get_environment(),
+        runs=[run_suite(count, args.seed, args.formats, args.repeat, not args.no_memory) for count in args.count]
+    )
+
+    if args.output:
+        with open(args.output, encoding='utf8', mode='w') as f:
+            json.dump(report, f, indent=4)
+    else:
+        print(json.dumps(report, indent=4))
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f'Regression: {regression}', file=sys.stderr)
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,209 @@
+import argparse
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Tuple, Union
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.generator import generate_publics_data
+
+EXECUTE_CALL_REGEX = re.compile(r'API\.groups\.getById\((\{.*?\})\)')
+BASE_FIELDS = ('id', 'name', 'screen_name', 'is_closed', 'type')
+ERROR_MESSAGES = {
+    6: 'Too many requests per second',
+    9: 'Flood control',
+    10: 'Internal server error',
+    13: 'Runtime error occurred during code invocation',
+    29: 'Rate limit reached',
+}
+
+
+class VkApiError(Exception):
+    def __init__(self, code: int, message: str = None) -> None:
+        super().__init__(code, message)
+        self.code = code
+        self.message = message if message else ERROR_MESSAGES.get(code, 'Unknown error occurred')
+
+    def to_dict(self, method: str) -> dict:
+        return dict(error_code=self.code, error_msg=self.message, method=method, request_params=[])
+
+
+class VkApiStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: 'VkApiStub'
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get('Content-Length', 0))
+        params = {key: value[0] for key, value in parse_qs(self.rfile.read(length).decode('utf-8')).items()}
+        method = urlparse(self.path).path.rsplit('/', 1)[-1]
+
+        body = self.server.handle(method, params)
+        if body is None:
+            self.close_connection = True
+            return
+
+        data, content_encoding = self.server.encode(body, self.headers.get('Accept-Encoding', ''))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        if content_encoding:
+            self.send_header('Content-Encoding', content_encoding)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class VkApiStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+            self,
+            publics_data: Iterable[dict],
+            host: str = '127.0.0.1',
+            port: int = 0,
+            latency: float = 0.,
+            jitter: float = 0.,
+            connection_error_rate: float = 0.,
+            error_rate: float = 0.,
+            error_code: int = 6,
+            compression: bool = True,
+            seed: int = 0
+    ) -> None:
+        super().__init__((host, port), VkApiStubHandler)
+        self.groups = {}
+        for data in publics_data:
+            self.groups[data['screen_name']] = data
+            self.groups[f'club{data["id"]}'] = data
+            self.groups[f'public{data["id"]}'] = data
+            self.groups[str(data['id'])] = data
+
+        self.latency = latency
+        self.jitter = jitter
+        self.connection_error_rate = connection_error_rate
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.compression = compression
+        self.stats = Counter()
+        self.__random = random.Random(seed)
+        self.__lock = threading.Lock()
+        self.__thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/method/'
+
+    def start(self) -> 'VkApiStub':
+        self.__thread = threading.Thread(target=self.serve_forever, name='vk-api-stub', daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self.__thread:
+            self.__thread.join()
+
+    def __enter__(self) -> 'VkApiStub':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def handle(self, method: str, params: Dict[str, str]) -> Union[dict, None]:
+        with self.__lock:
+            self.stats['requests'] += 1
+            self.stats[f'requests.{method}'] += 1
+            self.stats[f'requests.token.{params.get("access_token", "")}'] += 1
+            delay = self.latency + self.__random.uniform(0, self.jitter)
+            drop = self.__random.random() < self.connection_error_rate
+            fail = not drop and self.__random.random() < self.error_rate
+
+        if delay > 0:
+            time.sleep(delay)
+        if drop:
+            self.__count('connection_errors')
+            return None
+
+        try:
+            if fail:
+                raise VkApiError(self.error_code)
+            if method == 'groups.getById':
+                return dict(response=self.get_by_id(params.get('group_ids', ''), params.get('fields', '')))
+            if method == 'execute':
+                return dict(response=self.execute(params.get('code', '')))
+            raise VkApiError(3, 'Unknown method passed')
+        except VkApiError as e:
+            self.__count(f'api_errors.{e.code}')
+            return dict(error=e.to_dict(method))
+
+    def get_by_id(self, group_ids: str, fields: str = '') -> dict:
+        fields = {*BASE_FIELDS, *fields.split(',')}
+        groups = [
+            {field: value for field, value in self.groups[identify].items() if field in fields}
+            for identify in group_ids.split(',') if identify in self.groups
+        ]
+        self.__count('groups', len(groups))
+        return dict(groups=groups, profiles=[])
+
+    def execute(self, code: str) -> List[dict]:
+        calls = EXECUTE_CALL_REGEX.findall(code)
+        if not calls or len(calls) > 25:
+            raise VkApiError(13)
+        return [
+            self.get_by_id(params.get('group_ids', ''), params.get('fields', ''))
+            for params in map(json.loads, calls)
+        ]
+
+    def encode(self, body: dict, accept_encoding: str) -> Tuple[bytes, Union[str, None]]:
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        content_encoding = None
+        if self.compression and 'gzip' in accept_encoding:
+            data = gzip.compress(data, compresslevel=5)
+            content_encoding = 'gzip'
+        self.__count('bytes_sent', len(data))
+        return data, content_encoding
+
+    def __count(self, key: str, value: int = 1) -> None:
+        with self.__lock:
+            self.stats[key] += value
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local stand-in of VK API groups.getById and execute methods')
+    parser.add_argument('-n', '--count', type=int, default=10000, help='number of generated publics')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0., help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0., help='max random seconds added to the latency')
+    parser.add_argument('--connection-error-rate', type=float, default=0., help='share of dropped connections')
+    parser.add_argument('--error-rate', type=float, default=0., help='share of responses with VK API error')
+    parser.add_argument('--error-code', type=int, default=6, help='code of injected VK API errors')
+    parser.add_argument('--no-compression', action='store_true', help='ignore Accept-Encoding: gzip of requests')
+    args = parser.parse_args()
+
+    server = VkApiStub(
+        generate_publics_data(args.count, args.seed),
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        connection_error_rate=args.connection_error_rate,
+        error_rate=args.error_rate,
+        error_code=args.error_code,
+        compression=not args.no_compression,
+        seed=args.seed
+    )
+    print(f'Serving {args.count} publics on {server.url}, set it as API_URL of the VK API session')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
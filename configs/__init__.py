@@ -1,2 +1,2 @@
-from .config import CONFIG
-from .log import get_logger
+from .config import CONFIG, save_config_snapshot
+from .log import get_logger, setup_logging, summarize
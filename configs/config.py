@@ -1,24 +1,49 @@
+import functools
+import marshal
+import os
 from dataclasses import dataclass
-from typing import List, Dict
-
-from omegaconf import OmegaConf, DictConfig
+from typing import List, Dict, Tuple, Union
 
 from helpers import get_path
 
 CONFIG_PATH = get_path('config.yaml')
+CONFIG_SNAPSHOT_PATH = get_path('.config.snapshot')
+CONFIG_SNAPSHOT_VERSION = 1
+
+
+class FrozenSection:
+    __frozen = False
+
+    def freeze(self) -> None:
+        for value in vars(self).values():
+            if isinstance(value, FrozenSection):
+                value.freeze()
+        object.__setattr__(self, '_FrozenSection__frozen', True)
+
+    def __setattr__(self, name: str, value) -> None:
+        if self.__frozen:
+            raise AttributeError(f'Config section {type(self).__name__} is frozen, edit config.yaml instead')
+        super().__setattr__(name, value)
 
 
 @dataclass
-class Config:
-    _vk_api: DictConfig
+class Config(FrozenSection):
+    _vk_api: 'VkApi'
     _parsing: 'Parsing'
     _progressbar: 'Progressbar'
     _display: 'Display'
     _paths: 'Paths'
     _exceptions: 'Exceptions'
+    _cache: 'Cache'
+    _streaming: 'Streaming'
+    _metrics: 'Metrics'
+    _daemon: 'Daemon'
+    _service: 'Service'
+    _logging: 'Logging'
+    _pos_urls_cache: 'PosUrlsCache'
 
     @property
-    def vk_api(self) -> DictConfig:
+    def vk_api(self) -> 'VkApi':
         return self._vk_api
 
     @property
@@ -41,21 +66,109 @@ class Config:
     def exceptions(self) -> 'Exceptions':
         return self._exceptions
 
-    def __init__(self, data: DictConfig) -> None:
-        self._vk_api = data.vk_api
+    @property
+    def cache(self) -> 'Cache':
+        return self._cache
+
+    @property
+    def streaming(self) -> 'Streaming':
+        return self._streaming
+
+    @property
+    def metrics(self) -> 'Metrics':
+        return self._metrics
+
+    @property
+    def daemon(self) -> 'Daemon':
+        return self._daemon
+
+    @property
+    def service(self) -> 'Service':
+        return self._service
+
+    @property
+    def logging(self) -> 'Logging':
+        return self._logging
+
+    @property
+    def pos_urls_cache(self) -> 'PosUrlsCache':
+        return self._pos_urls_cache
+
+    def __init__(self, data: dict) -> None:
+        self._vk_api = self.VkApi(data.get('vk_api'))
         self._parsing = self.Parsing(data.get('parsing'))
         self._progressbar = self.Progressbar(data.get('progressbar'))
         self._display = self.Display(data.get('display'))
         self._paths = self.Paths(data.get('paths'))
         self._exceptions = self.Exceptions(data.get('exceptions'))
+        self._cache = self.Cache(data.get('cache'))
+        self._streaming = self.Streaming(data.get('streaming'))
+        self._metrics = self.Metrics(data.get('metrics'))
+        self._daemon = self.Daemon(data.get('daemon'))
+        self._service = self.Service(data.get('service'))
+        self._logging = self.Logging(data.get('logging'))
+        self._pos_urls_cache = self.PosUrlsCache(data.get('pos_urls_cache'))
+
+    @dataclass
+    class VkApi(FrozenSection):
+        _access_tokens: List[str]
+        _version: float
+        _workers: int
+        _requests_per_second: float
+        _execute_batch_size: int
+        _execute_max_code_length: int
+
+        @property
+        def access_token(self) -> str:
+            return self._access_tokens[0]
+
+        @property
+        def access_tokens(self) -> List[str]:
+            return self._access_tokens
+
+        @property
+        def version(self) -> float:
+            return self._version
+
+        @property
+        def workers(self) -> int:
+            return self._workers
+
+        @property
+        def requests_per_second(self) -> float:
+            return self._requests_per_second
+
+        @property
+        def execute_batch_size(self) -> int:
+            return self._execute_batch_size
+
+        @property
+        def execute_max_code_length(self) -> int:
+            return self._execute_max_code_length
+
+        def __init__(self, data: dict = None) -> None:
+            if not data:
+                data = {}
+
+            access_token = data.get('access_token', '')
+            self._access_tokens = [access_token] if isinstance(access_token, str) else list(access_token) or ['']
+            self._version = data.get('version', 5.221)
+            self._workers = max(int(data.get('workers', 1)), 1)
+            self._requests_per_second = float(data.get('requests_per_second', 3))
+            self._execute_batch_size = min(max(int(data.get('execute_batch_size', 25)), 1), 25)
+            self._execute_max_code_length = data.get('execute_max_code_length', 65536)
 
     @dataclass
-    class Parsing:
+    class Parsing(FrozenSection):
         _max_links_per_widget: int
         _skip_correct: bool
         _save_public_data: bool
         _public_data_fields: list
+        _minimal_fields: bool
         _utm_codes_regex: dict
+        _incremental: bool
+        _journal: bool
+        _resolve_ids: bool
 
         @property
         def max_links_per_widget(self) -> int:
@@ -73,11 +186,27 @@ class Config:
         def public_data_fields(self) -> List[str]:
             return self._public_data_fields
 
+        @property
+        def minimal_fields(self) -> bool:
+            return self._minimal_fields
+
         @property
         def utm_codes_regex(self) -> Dict[str, str]:
             return self._utm_codes_regex
 
-        def __init__(self, data: DictConfig = None) -> None:
+        @property
+        def incremental(self) -> bool:
+            return self._incremental
+
+        @property
+        def journal(self) -> bool:
+            return self._journal
+
+        @property
+        def resolve_ids(self) -> bool:
+            return self._resolve_ids
+
+        def __init__(self, data: dict = None) -> None:
             if not data:
                 data = {}
 
@@ -85,20 +214,40 @@ class Config:
             self._skip_correct = data.get('skip_correct', False)
             self._save_public_data = data.get('save_public_data', True)
             self._public_data_fields = data.get('public_data_fields', ['menu', 'is_government_organization'])
+            self._minimal_fields = data.get('minimal_fields', True)
             self._utm_codes_regex = data.get('utm_codes_regex', {})
+            self._incremental = data.get('incremental', False)
+            self._journal = data.get('journal', True)
+            self._resolve_ids = data.get('resolve_ids', True)
 
     @dataclass
-    class Progressbar:
-        min_interval_per_unit: float
+    class Progressbar(FrozenSection):
+        _mode: str
+        _refresh_interval: float
+        _log_interval: float
+
+        @property
+        def mode(self) -> str:
+            return self._mode
+
+        @property
+        def refresh_interval(self) -> float:
+            return self._refresh_interval
+
+        @property
+        def log_interval(self) -> float:
+            return self._log_interval
 
-        def __init__(self, data: DictConfig) -> None:
+        def __init__(self, data: dict) -> None:
             if not data:
                 data = {}
 
-            self.min_interval_per_unit = data.get('min_interval_per_unit', 0.)
+            self._mode = data.get('mode', 'auto')
+            self._refresh_interval = max(float(data.get('refresh_interval', .5)), 0.)
+            self._log_interval = max(float(data.get('log_interval', 10)), 0.)
 
     @dataclass
-    class Display:
+    class Display(FrozenSection):
         _csv_delimiter: str
         _public_display_fields: list
         _show_utm_status: bool
@@ -131,7 +280,7 @@ class Config:
             return self._result_types
 
         @dataclass
-        class Type:
+        class Type(FrozenSection):
             _pattern: str
             _items: dict
 
@@ -147,7 +296,7 @@ class Config:
                 self._pattern = pattern
                 self._items = items
 
-        def __init__(self, data: DictConfig) -> None:
+        def __init__(self, data: dict) -> None:
             if not data:
                 data = {}
 
@@ -190,11 +339,19 @@ class Config:
             )))
 
     @dataclass
-    class Paths:
+    class Paths(FrozenSection):
         _log_file: str
         _target_file: str
         _result_file: str
-        _save_public_data_dir: str
+        _archive_file: str
+        _cache_file: str
+        _state_file: str
+        _journal_file: str
+        _ids_file: str
+        _report_file: str
+        _prometheus_file: str
+        _queue_file: str
+        _pos_urls_file: str
 
         @property
         def log_file(self) -> str:
@@ -209,34 +366,360 @@ class Config:
             return self._result_file
 
         @property
-        def save_public_data_dir(self) -> str:
-            return self._save_public_data_dir
+        def archive_file(self) -> str:
+            return self._archive_file
+
+        @property
+        def cache_file(self) -> str:
+            return self._cache_file
+
+        @property
+        def state_file(self) -> str:
+            return self._state_file
+
+        @property
+        def journal_file(self) -> str:
+            return self._journal_file
+
+        @property
+        def ids_file(self) -> str:
+            return self._ids_file
+
+        @property
+        def report_file(self) -> str:
+            return self._report_file
+
+        @property
+        def prometheus_file(self) -> str:
+            return self._prometheus_file
+
+        @property
+        def queue_file(self) -> str:
+            return self._queue_file
+
+        @property
+        def pos_urls_file(self) -> str:
+            return self._pos_urls_file
 
-        def __init__(self, data: DictConfig) -> None:
+        def __init__(self, data: dict) -> None:
             if not data:
                 data = {}
 
             self._log_file = get_path(data.get('log_file', 'runtime.log'))
             self._target_file = get_path(data.get('target_file', 'target.txt'))
             self._result_file = get_path(data.get('result_file', 'result.csv'))
-            self._save_public_data_dir = get_path(data.get('save_public_data_dir', 'publics_data'))
+            self._archive_file = get_path(data.get('archive_file', 'publics_data.sqlite'))
+            self._cache_file = get_path(data.get('cache_file', 'cache.sqlite'))
+            self._state_file = get_path(data.get('state_file', 'state.sqlite'))
+            self._journal_file = get_path(data.get('journal_file', 'journal.jsonl'))
+            self._ids_file = get_path(data.get('ids_file', 'ids.sqlite'))
+            self._report_file = get_path(data.get('report_file', 'report.json'))
+            self._prometheus_file = get_path(data.get('prometheus_file', 'metrics.prom'))
+            self._queue_file = get_path(data.get('queue_file', 'queue.sqlite'))
+            self._pos_urls_file = get_path(data.get('pos_urls_file', 'pos_urls.sqlite'))
 
     @dataclass
-    class Exceptions:
+    class Exceptions(FrozenSection):
         _connection: Dict
+        _circuit_breaker: Dict
 
         @property
         def connection(self) -> Dict:
             return self._connection
 
-        def __init__(self, data: DictConfig) -> None:
+        @property
+        def circuit_breaker(self) -> Dict:
+            return self._circuit_breaker
+
+        def __init__(self, data: dict) -> None:
             if not data:
                 data = {}
 
             self._connection = data.get('connection', dict(
                 max_tries=5,
-                timeout=5
+                timeout=5,
+                max_timeout=60,
+                jitter=True
+            ))
+            self._circuit_breaker = data.get('circuit_breaker', dict(
+                failures=10,
+                reset_timeout=30
             ))
 
+    @dataclass
+    class Cache(FrozenSection):
+        _enabled: bool
+        _ttl: float
+
+        @property
+        def enabled(self) -> bool:
+            return self._enabled
+
+        @property
+        def ttl(self) -> float:
+            return self._ttl
+
+        def __init__(self, data: dict) -> None:
+            if not data:
+                data = {}
+
+            self._enabled = data.get('enabled', False)
+            self._ttl = data.get('ttl', 3600)
+
+    @dataclass
+    class Streaming(FrozenSection):
+        _enabled: bool
+        _chunk_size: int
+        _pos_links: int
+
+        @property
+        def enabled(self) -> bool:
+            return self._enabled
+
+        @property
+        def chunk_size(self) -> int:
+            return self._chunk_size
+
+        @property
+        def pos_links(self) -> int:
+            return self._pos_links
+
+        def __init__(self, data: dict) -> None:
+            if not data:
+                data = {}
+
+            self._enabled = data.get('enabled', False)
+            self._chunk_size = max(int(data.get('chunk_size', 5000)), 1)
+            self._pos_links = data.get('pos_links', 3)
+
+    @dataclass
+    class Metrics(FrozenSection):
+        _enabled: bool
+        _prometheus: bool
+
+        @property
+        def enabled(self) -> bool:
+            return self._enabled
+
+        @property
+        def prometheus(self) -> bool:
+            return self._prometheus
+
+        def __init__(self, data: dict) -> None:
+            if not data:
+                data = {}
+
+            self._enabled = data.get('enabled', True)
+            self._prometheus = data.get('prometheus', False)
+
+    @dataclass
+    class Daemon(FrozenSection):
+        _requests_per_day: float
+        _batch_size: int
+        _intervals: Dict[str, float]
+        _jitter: float
+        _reload_interval: float
+        _report_interval: float
+
+        @property
+        def requests_per_day(self) -> float:
+            return self._requests_per_day
+
+        @property
+        def batch_size(self) -> int:
+            return self._batch_size
+
+        @property
+        def intervals(self) -> Dict[str, float]:
+            return self._intervals
+
+        @property
+        def jitter(self) -> float:
+            return self._jitter
+
+        @property
+        def reload_interval(self) -> float:
+            return self._reload_interval
+
+        @property
+        def report_interval(self) -> float:
+            return self._report_interval
+
+        def __init__(self, data: dict) -> None:
+            if not data:
+                data = {}
+
+            self._requests_per_day = float(data.get('requests_per_day', 5000))
+            self._batch_size = max(int(data.get('batch_size', 500)), 1)
+            self._intervals = data.get('intervals', dict(
+                CORRECT=86400,
+                LINKS_COUNT=43200,
+                MISSING=43200,
+                INVALID=10800,
+                TIMEOUT=1800,
+                ERROR=3600
+            ))
+            self._jitter = min(max(float(data.get('jitter', .1)), 0.), 1.)
+            self._reload_interval = data.get('reload_interval', 300)
+            self._report_interval = data.get('report_interval', 600)
+
+    @dataclass
+    class Service(FrozenSection):
+        _host: str
+        _port: int
+        _batch_size: int
+        _batch_window: float
+        _cache_ttl: float
+        _cache_size: int
+        _timeout: float
+        _max_urls: int
+        _fail_fast: bool
+
+        @property
+        def host(self) -> str:
+            return self._host
+
+        @property
+        def port(self) -> int:
+            return self._port
+
+        @property
+        def batch_size(self) -> int:
+            return self._batch_size
+
+        @property
+        def batch_window(self) -> float:
+            return self._batch_window
+
+        @property
+        def cache_ttl(self) -> float:
+            return self._cache_ttl
+
+        @property
+        def cache_size(self) -> int:
+            return self._cache_size
+
+        @property
+        def timeout(self) -> float:
+            return self._timeout
+
+        @property
+        def max_urls(self) -> int:
+            return self._max_urls
+
+        @property
+        def fail_fast(self) -> bool:
+            return self._fail_fast
+
+        def __init__(self, data: dict) -> None:
+            if not data:
+                data = {}
+
+            self._host = data.get('host', '127.0.0.1')
+            self._port = int(data.get('port', 8000))
+            self._batch_size = max(int(data.get('batch_size', 500)), 1)
+            self._batch_window = max(float(data.get('batch_window', .05)), 0.)
+            self._cache_ttl = float(data.get('cache_ttl', 300))
+            self._cache_size = int(data.get('cache_size', 10000))
+            self._timeout = float(data.get('timeout', 60))
+            self._max_urls = max(int(data.get('max_urls', 10000)), 1)
+            self._fail_fast = data.get('fail_fast', True)
+
+    @dataclass
+    class Logging(FrozenSection):
+        _level: str
+        _format: str
+
+        @property
+        def level(self) -> str:
+            return self._level
+
+        @property
+        def format(self) -> str:
+            return self._format
+
+        def __init__(self, data: dict) -> None:
+            if not data:
+                data = {}
+
+            self._level = str(data.get('level', 'INFO')).upper()
+            self._format = data.get('format', 'text')
+            if self._level not in ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'):
+                raise ValueError(f'Unknown logging level {self._level!r}')
+            if self._format not in ('text', 'json'):
+                raise ValueError(f'Unknown logging format {self._format!r}, expected "text" or "json"')
+
+    @dataclass
+    class PosUrlsCache(FrozenSection):
+        _enabled: bool
+        _max_size: int
+        _persist: bool
+
+        @property
+        def enabled(self) -> bool:
+            return self._enabled
+
+        @property
+        def max_size(self) -> int:
+            return self._max_size
+
+        @property
+        def persist(self) -> bool:
+            return self._persist
+
+        def __init__(self, data: dict) -> None:
+            if not data:
+                data = {}
+
+            self._enabled = data.get('enabled', True)
+            self._max_size = int(data.get('max_size', 100000))
+            self._persist = data.get('persist', False)
+
+
+def get_config_key(path: str) -> list:
+    stat = os.stat(path)
+    return [CONFIG_SNAPSHOT_VERSION, path, stat.st_mtime_ns, stat.st_size]
+
+
+def read_config_snapshot(snapshot_path: str, key: list) -> Union[dict, None]:
+    try:
+        with open(snapshot_path, 'rb') as f:
+            snapshot_key, data = marshal.load(f)
+        if snapshot_key == key:
+            return data
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def parse_config_data(path: str, key: Tuple) -> dict:
+    from omegaconf import OmegaConf
+
+    return OmegaConf.to_container(OmegaConf.load(path), resolve=True)
+
+
+def load_config_data(path: str, snapshot_path: str) -> dict:
+    key = get_config_key(path)
+    data = read_config_snapshot(snapshot_path, key)
+    if data is None:
+        data = parse_config_data(path, tuple(key))
+    return data
+
+
+def save_config_snapshot(path: str = CONFIG_PATH, snapshot_path: str = CONFIG_SNAPSHOT_PATH) -> None:
+    key = get_config_key(path)
+    if read_config_snapshot(snapshot_path, key) is not None:
+        return
+
+    data = parse_config_data(path, tuple(key))
+    try:
+        with open(f'{snapshot_path}.tmp', 'wb') as f:
+            marshal.dump([key, data], f)
+        os.replace(f'{snapshot_path}.tmp', snapshot_path)
+    except (OSError, ValueError):
+        pass
+
 
-CONFIG = Config(data=OmegaConf.load(CONFIG_PATH))
+CONFIG = Config(data=load_config_data(CONFIG_PATH, CONFIG_SNAPSHOT_PATH))
+CONFIG.freeze()
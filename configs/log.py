@@ -1,4 +1,10 @@
+import atexit
+import copy
+import json
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Iterable
 
 from . import CONFIG
 
@@ -10,14 +16,73 @@ LOG_FILE_FORMATTER = logging.Formatter(
     fmt=LOG_FORMAT,
     datefmt=LOG_DATE_FORMAT,
 )
+SUMMARY_ITEMS = 5
 
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data = dict(
+            time=f'{self.formatTime(record, LOG_DATE_FORMAT)}.{int(record.msecs):03d}',
+            app=APP_NAME,
+            level=record.levelname,
+            thread=record.threadName,
+            logger=record.name,
+            func=record.funcName,
+            line=record.lineno,
+            message=record.getMessage(),
+        )
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exception'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False)
+
+
+class RecordQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = LOG_FILE_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class Summary:
+    __slots__ = ('items', 'limit')
+
+    def __init__(self, items: Iterable, limit: int = SUMMARY_ITEMS) -> None:
+        self.items = items
+        self.limit = limit
+
+    def __str__(self) -> str:
+        items = list(self.items)
+        summary = ','.join(map(str, items[:self.limit]))
+        if len(items) > self.limit:
+            summary += f',... ({len(items)} total)'
+        return f'[{summary}]'
+
+
+def summarize(items: Iterable, limit: int = SUMMARY_ITEMS) -> Summary:
+    return Summary(items, limit)
+
+
+def setup_logging() -> None:
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, get_runtime_handler(), respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
 
-def setup():
     logging.basicConfig(
-        format=LOG_FORMAT,
-        datefmt=LOG_DATE_FORMAT,
-        level=logging.DEBUG,
-        handlers=[get_runtime_handler()]
+        level=CONFIG.logging.level,
+        handlers=[RecordQueueHandler(log_queue)]
     )
 
     loggers = ['selenium', 'urllib3']
@@ -25,28 +90,13 @@ def setup():
         logger = logging.getLogger(logger_name)
         logger.setLevel(logging.ERROR)
 
-    add_thread_name_to_log_format()
-
-
-def add_thread_name_to_log_format():
-    current_formatter = logging.getLogger().handlers[0].formatter
-    new_format = current_formatter._fmt.replace('%(threadName)s', '%(threadName)s')
-    new_formatter = logging.Formatter(fmt=new_format, datefmt=LOG_DATE_FORMAT)
-    current_handler = logging.getLogger().handlers[0]
-    current_handler.setFormatter(new_formatter)
-
 
 def get_runtime_handler():
-    runtime_handler = logging.FileHandler(filename=CONFIG.paths.log_file, encoding='utf-8')
-    runtime_handler.setFormatter(LOG_FILE_FORMATTER)
-    runtime_handler.setLevel(level=logging.DEBUG)
+    runtime_handler = logging.FileHandler(filename=CONFIG.paths.log_file, encoding='utf-8', delay=True)
+    runtime_handler.setFormatter(JsonFormatter() if CONFIG.logging.format == 'json' else LOG_FILE_FORMATTER)
+    runtime_handler.setLevel(level=CONFIG.logging.level)
     return runtime_handler
 
 
 def get_logger(name: str = __name__) -> logging.Logger:
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)
-    return logger
-
-
-setup()
+    return logging.getLogger(name)
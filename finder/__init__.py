@@ -1,5 +1,14 @@
 from .models import (
     Public,
     PosUrl,
-    PosWidget
+    PosWidget,
+    PosUrlsCache
 )
+from .cache import PublicsCache
+from .state import ChecksState
+from .journal import RunJournal
+from .resolver import IdsResolver
+from .archive import PublicsArchive
+from .offline import check_archived_publics, iter_archived_checks, fetch_archived_publics, process_publics_offline
+from .scheduler import ChecksQueue, ChecksDaemon
+from .pos_urls import PosUrlsStore
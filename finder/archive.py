@@ -0,0 +1,119 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, Iterator, List, Union
+
+from configs import get_logger
+from helpers import parse_identify, split_list
+
+logger = get_logger(__name__)
+
+
+class PublicsArchive:
+    def __init__(self, path: str, queue_size: int = 64) -> None:
+        self.path = path
+        self.__queue = queue.Queue(maxsize=queue_size)
+        self.__thread = None
+        self.__error = None
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        self.__connection.execute('PRAGMA journal_mode=WAL')
+        self.__connection.execute(
+            'CREATE TABLE IF NOT EXISTS publics ('
+            'id INTEGER PRIMARY KEY, '
+            'screen_name TEXT, '
+            'archived_at REAL NOT NULL, '
+            'data BLOB NOT NULL)'
+        )
+        self.__connection.execute('CREATE INDEX IF NOT EXISTS publics_screen_name ON publics (screen_name)')
+        self.__connection.commit()
+
+    def put_many(self, publics_data: Iterable[dict]) -> None:
+        if self.__error:
+            raise RuntimeError(f'Archive writer {self.path!r} failed') from self.__error
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self.__write, name='archive-writer', daemon=True)
+            self.__thread.start()
+
+        publics_data: List[dict] = [data for data in publics_data if data.get('id')]
+        if publics_data:
+            self.__queue.put(publics_data)
+
+    def __write(self) -> None:
+        connection = sqlite3.connect(self.path)
+        try:
+            while True:
+                publics_data = self.__queue.get()
+                if publics_data is None:
+                    break
+                if self.__error:
+                    continue
+                try:
+                    archived_at = time.time()
+                    connection.executemany(
+                        'INSERT OR REPLACE INTO publics (id, screen_name, archived_at, data) VALUES (?, ?, ?, ?)',
+                        [
+                            (
+                                data['id'],
+                                str(data.get('screen_name', '')).lower(),
+                                archived_at,
+                                zlib.compress(json.dumps(data, ensure_ascii=False).encode('utf-8'))
+                            )
+                            for data in publics_data
+                        ]
+                    )
+                    connection.commit()
+                except sqlite3.Error as e:
+                    logger.exception(f'Failed to write {len(publics_data)} publics to archive {self.path!r}')
+                    self.__error = e
+        finally:
+            connection.close()
+
+    @classmethod
+    def get_key(cls, identify: str) -> Union[int, str]:
+        key = parse_identify(identify)
+        return int(key) if isinstance(key, int) or key.isdigit() else key.lower()
+
+    def get(self, identify: str) -> Union[dict, None]:
+        return self.get_many([identify]).get(identify)
+
+    def get_many(self, identifies: Iterable[str], raw: bool = False) -> Dict[str, Union[dict, bytes]]:
+        keys = {identify: self.get_key(identify) for identify in identifies}
+
+        ids = {key for key in keys.values() if isinstance(key, int)}
+        screen_names = {key for key in keys.values() if isinstance(key, str)}
+        rows = {}
+        for column, values in (('id', list(ids)), ('screen_name', list(screen_names))):
+            for chunk in split_list(values, 500):
+                rows.update(self.__connection.execute(
+                    f'SELECT {column}, data FROM publics WHERE {column} IN ({",".join("?" * len(chunk))})',
+                    chunk
+                ).fetchall())
+
+        result = {identify: rows[key] for identify, key in keys.items() if key in rows}
+        logger.info(f'Found {len(result)} of {len(keys)} publics in archive {self.path!r}')
+        return result if raw else {identify: self.decode(data) for identify, data in result.items()}
+
+    def iter_publics(self) -> Iterator[dict]:
+        for row in self.__connection.execute('SELECT data FROM publics ORDER BY id'):
+            yield self.decode(row[0])
+
+    def count(self) -> int:
+        return self.__connection.execute('SELECT COUNT(*) FROM publics').fetchone()[0]
+
+    @classmethod
+    def decode(cls, data: bytes) -> dict:
+        return json.loads(zlib.decompress(data).decode('utf-8'))
+
+    def close(self) -> None:
+        if self.__thread is not None:
+            self.__queue.put(None)
+            self.__thread.join()
+            self.__thread = None
+            logger.info(f'Archive {self.path!r} contains {self.count()} publics')
+        self.__connection.close()
+        if self.__error:
+            raise RuntimeError(f'Archive writer {self.path!r} failed') from self.__error
+
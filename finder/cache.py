@@ -0,0 +1,79 @@
+import json
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Union
+
+from configs import get_logger
+from helpers import parse_identify, split_list
+
+logger = get_logger(__name__)
+
+
+class PublicsCache:
+    def __init__(self, path: str, ttl: float, fields: List[str]) -> None:
+        self.ttl = ttl
+        self.fields = ','.join(sorted(fields))
+        self.__connection = sqlite3.connect(path)
+        self.__connection.execute(
+            'CREATE TABLE IF NOT EXISTS publics ('
+            'id INTEGER PRIMARY KEY, '
+            'screen_name TEXT, '
+            'fields TEXT NOT NULL, '
+            'fetched_at REAL NOT NULL, '
+            'data TEXT NOT NULL)'
+        )
+        self.__connection.execute('CREATE INDEX IF NOT EXISTS publics_screen_name ON publics (screen_name)')
+        self.__connection.commit()
+        self.delete_expired()
+
+    @classmethod
+    def get_key(cls, identify: str) -> Union[int, str]:
+        key = parse_identify(identify)
+        return key if isinstance(key, int) else key.lower()
+
+    def get_many(self, identifies: Iterable[str]) -> Dict[str, dict]:
+        min_fetched_at = time.time() - self.ttl
+        keys = {identify: self.get_key(identify) for identify in identifies}
+
+        ids = {key for key in keys.values() if isinstance(key, int)}
+        screen_names = {key for key in keys.values() if isinstance(key, str)}
+        rows = {}
+        for column, values in (('id', list(ids)), ('screen_name', list(screen_names))):
+            for chunk in split_list(values, 500):
+                rows.update(self.__connection.execute(
+                    f'SELECT {column}, data FROM publics '
+                    f'WHERE {column} IN ({",".join("?" * len(chunk))}) AND fields = ? AND fetched_at >= ?',
+                    (*chunk, self.fields, min_fetched_at)
+                ).fetchall())
+
+        result = {identify: json.loads(rows[key]) for identify, key in keys.items() if key in rows}
+        logger.info(f'Found {len(result)} of {len(keys)} publics in cache')
+        return result
+
+    def put_many(self, publics_data: Iterable[dict]) -> None:
+        fetched_at = time.time()
+        self.__connection.executemany(
+            'INSERT OR REPLACE INTO publics (id, screen_name, fields, fetched_at, data) VALUES (?, ?, ?, ?, ?)',
+            [
+                (
+                    data['id'],
+                    str(data.get('screen_name', '')).lower(),
+                    self.fields,
+                    fetched_at,
+                    json.dumps(data, ensure_ascii=False)
+                )
+                for data in publics_data
+            ]
+        )
+        self.__connection.commit()
+
+    def delete_expired(self) -> None:
+        deleted = self.__connection.execute(
+            'DELETE FROM publics WHERE fetched_at < ?', (time.time() - self.ttl,)
+        ).rowcount
+        self.__connection.commit()
+        if deleted:
+            logger.info(f'Deleted {deleted} expired publics from cache')
+
+    def close(self) -> None:
+        self.__connection.close()
@@ -0,0 +1,65 @@
+import json
+import os
+from typing import Dict, Iterable
+
+from configs import get_logger
+from .models import Public
+
+logger = get_logger(__name__)
+
+
+class RunJournal:
+    def __init__(self, path: str, fields: Iterable[str]) -> None:
+        self.path = path
+        self.fields = set(fields)
+        self.entries = {}
+        self.__file = None
+
+    def open(self, resume: bool = False) -> Dict[str, dict]:
+        self.entries = self.load() if resume else {}
+        self.__file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        if resume and self.__file.tell() > 0:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self.__file.write('\n')
+        return self.entries
+
+    def load(self) -> Dict[str, dict]:
+        entries = {}
+        if not os.path.exists(self.path):
+            return entries
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f'Skip broken line {line_number} of journal {self.path!r}')
+                    continue
+                entries[entry['url']] = entry
+
+        logger.info(f'Loaded {len(entries)} processed publics from journal {self.path!r}')
+        return entries
+
+    def write_many(self, publics: Iterable[Public]) -> None:
+        for public in publics:
+            self.__file.write(json.dumps(
+                dict(
+                    url=public.url,
+                    data={k: v for k, v in public.data.items() if k in self.fields},
+                    pos_widget=public.pos_widget.to_dict()
+                ),
+                ensure_ascii=False,
+                separators=(',', ':')
+            ))
+            self.__file.write('\n')
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
+
+    def close(self) -> None:
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
@@ -1,6 +1,11 @@
 import re
 import enum
-from typing import List, Dict, Tuple, Union
+import functools
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Iterable, NamedTuple, Pattern, Tuple, Type, Union
 from urllib.parse import urlparse, parse_qs
 
 from configs import get_logger, CONFIG
@@ -8,14 +13,22 @@ from configs import get_logger, CONFIG
 logger = get_logger(__name__)
 
 
+@functools.lru_cache(maxsize=None)
+def compile_pattern(pattern: str) -> Pattern:
+    return re.compile(pattern)
+
+
 class Public:
+    __slots__ = ('__url', 'is_government_org', 'pos_widget', 'data')
+
     __url: str
-    is_government_org: Union[bool, None] = None
+    is_government_org: Union[bool, None]
     pos_widget: 'PosWidget'
     data: dict
 
     def __init__(self, url: str):
         self.__url = url
+        self.is_government_org = None
         self.pos_widget = PosWidget()
         self.data = {}
 
@@ -25,7 +38,7 @@ class Public:
 
     @property
     def identify(self) -> str:
-        split_url = self.__url.split('/')
+        split_url = self.__url.rstrip('/').split('/')
         return split_url[-1] if split_url else ''
 
     def get_field_data(self, field: str):
@@ -47,22 +60,51 @@ class Public:
         self.data = data
         return self
 
+    def restore(self, data: dict, pos_widget: dict) -> 'Public':
+        self.is_government_org = data.get('is_government_org', None)
+        self.pos_widget = PosWidget.from_dict(pos_widget)
+        self.data = data
+        return self
+
+
+class UTMRule(NamedTuple):
+    code: Union[str, None]
+    hint: str
+    pattern: Union[str, None]
+    regex: Union[Pattern, None]
+
+
+@functools.lru_cache(maxsize=None)
+def get_utm_rule(code: str = None, hint: str = 'Undefined UTM-code', pattern: str = None) -> UTMRule:
+    return UTMRule(code=code, hint=hint, pattern=pattern, regex=compile_pattern(pattern) if pattern else None)
+
 
 class UTMCode:
-    _code: str
-    _param: str = None
-    _pattern: str = None
-    _value: str = None
-    _hint: str = 'Undefined UTM-code'
-    _is_valid: bool = False
+    __slots__ = ('_rule', '_param', '_value', '_is_valid')
+
+    RULE: UTMRule = get_utm_rule()
+
+    _rule: UTMRule
+    _param: str
+    _value: str
+    _is_valid: bool
 
     def __init__(self, code: str = None, hint: str = None, pattern: str = None) -> None:
-        if code:
-            self._code = code
-        if hint:
-            self._hint = hint
-        if pattern:
-            self._pattern = pattern
+        rule = self.RULE
+        if code or hint or pattern:
+            rule = get_utm_rule(code=code or rule.code, hint=hint or rule.hint, pattern=pattern or rule.pattern)
+        self._rule = rule
+        self._param = None
+        self._value = None
+        self._is_valid = False
+
+    @property
+    def code(self) -> str:
+        return self._rule.code
+
+    @property
+    def pattern(self) -> str:
+        return self._rule.pattern
 
     @property
     def param(self) -> str:
@@ -83,25 +125,50 @@ class UTMCode:
 
     @property
     def hint(self) -> str:
-        return self._hint
+        return self._rule.hint
 
     @property
     def is_valid(self) -> bool:
         return self._is_valid
 
+    def to_list(self) -> list:
+        return [self._rule.code, self._param, self._value, self._rule.pattern, self._is_valid]
+
+    @classmethod
+    def from_list(cls, data: list, template: 'UTMCode' = None) -> 'UTMCode':
+        code, param, value, pattern, is_valid = data
+        if template is not None and template.code == code and template.pattern == pattern:
+            utm_code = template.copy()
+        else:
+            utm_code = cls(code=code, pattern=pattern)
+        utm_code._param = param
+        utm_code._value = value
+        utm_code._is_valid = is_valid
+        return utm_code
+
+    def copy(self) -> 'UTMCode':
+        utm_code = self.__class__.__new__(self.__class__)
+        utm_code._rule = self._rule
+        utm_code._param = self._param
+        utm_code._value = self._value
+        utm_code._is_valid = self._is_valid
+        return utm_code
+
+    def match(self, value: str) -> bool:
+        regex = self._rule.regex
+        return regex is not None and regex.fullmatch(value) is not None
+
     def validate(self) -> None:
-        if self._pattern:
-            pattern = re.compile(self._pattern)
-            match = re.fullmatch(pattern, self._value)
-            self._is_valid = bool(match)
+        if self._rule.regex is not None:
+            self._is_valid = self.match(self._value)
 
     def __str__(self):
         codes_hints = CONFIG.display.codes_hints
-        hint = codes_hints.items.get(self._code)
+        hint = codes_hints.items.get(self._rule.code)
         return codes_hints.pattern.format(
-            code=self._code,
+            code=self._rule.code,
             param=self._param,
-            pattern=f'{self._pattern!r}',
+            pattern=f'{self._rule.pattern!r}',
             value=f'{self._value!r}',
             hint=hint,
             is_valid=self._is_valid
@@ -109,36 +176,48 @@ class UTMCode:
 
     def __repr__(self) -> str:
         return f'<{self.__class__.__name__} ' \
-               f'code={self._code!r}, ' \
+               f'code={self._rule.code!r}, ' \
                f'param={self._param!r}, ' \
                f'value={self._value!r}, ' \
-               f'pattern={self._pattern!r}, ' \
+               f'pattern={self._rule.pattern!r}, ' \
                f'is_valid={self._is_valid}' \
                f'>'
 
 
 class OpaId(UTMCode):
-    _code = 'ID'
-    _pattern = CONFIG.parsing.utm_codes_regex.get(_code, r'\d+')
-    _hint = 'Only digits expected'
+    __slots__ = ()
+    RULE = get_utm_rule(
+        code='ID',
+        hint='Only digits expected',
+        pattern=CONFIG.parsing.utm_codes_regex.get('ID', r'\d+')
+    )
 
 
 class RegCode(UTMCode):
-    _code = 'REG-CODE'
-    _pattern = CONFIG.parsing.utm_codes_regex.get(_code, r'\d{2}|111|711|7114')
-    _hint = 'Only 2 digits or 111|711|7114 expected'
+    __slots__ = ()
+    RULE = get_utm_rule(
+        code='REG-CODE',
+        hint='Only 2 digits or 111|711|7114 expected',
+        pattern=CONFIG.parsing.utm_codes_regex.get('REG-CODE', r'\d{2}|111|711|7114')
+    )
 
 
 class MunCode(UTMCode):
-    _code = 'MUN-CODE'
-    _pattern = CONFIG.parsing.utm_codes_regex.get(_code, r'\d{8}')
-    _hint = 'Only 8 digits expected'
+    __slots__ = ()
+    RULE = get_utm_rule(
+        code='MUN-CODE',
+        hint='Only 8 digits expected',
+        pattern=CONFIG.parsing.utm_codes_regex.get('MUN-CODE', r'\d{8}')
+    )
 
 
 class OgrnCode(UTMCode):
-    _code = 'OGRN'
-    _pattern = CONFIG.parsing.utm_codes_regex.get(_code, r'\d{13}')
-    _hint = 'Only 13 digits expected'
+    __slots__ = ()
+    RULE = get_utm_rule(
+        code='OGRN',
+        hint='Only 13 digits expected',
+        pattern=CONFIG.parsing.utm_codes_regex.get('OGRN', r'\d{13}')
+    )
 
 
 class Source(enum.Enum):
@@ -155,10 +234,10 @@ class Source(enum.Enum):
 
     @classmethod
     def get_by_value(cls, value: str) -> 'Source':
-        for member_name, member in Source.__members__.items():
-            if value == member.value:
-                return member
-        return Source.UNDEFINED
+        try:
+            return cls(value)
+        except ValueError:
+            return Source.UNDEFINED
 
 
 class PosUrl:
@@ -168,6 +247,8 @@ class PosUrl:
                        r'&(utm_source=vk|utm_source=vk[12])' \
                        r'&(utm_medium=\d{2}|111|711|7114)' \
                        r'&(utm_campaign=\d{13})'
+    SPACERS_REGEX = compile_pattern(SPACERS_PATTERN)
+    TEMPLATE_REGEX = compile_pattern(TEMPLATE_PATTERN)
 
     class StatusType(enum.Enum):
         VALID = CONFIG.display.status_types.items['VALID']
@@ -179,9 +260,13 @@ class PosUrl:
         def __str__(self) -> str:
             return CONFIG.display.status_types.pattern.format(**self.value)
 
+    __slots__ = ('__url', '_utm_codes', 'status_type')
+
+    UTM_CODES: Dict[str, UTMCode] = {}
+
     _path: str = None
     _source: Source = Source.UNDEFINED
-    _utm_codes: Dict[str, UTMCode] = {}
+    _utm_codes: Dict[str, UTMCode]
     status_type: 'StatusType'
 
     @property
@@ -196,52 +281,88 @@ class PosUrl:
     def utm_codes(self) -> Dict[str, UTMCode]:
         return self._utm_codes
 
+    @classmethod
+    def get_status_type(cls, url: str, path: str, params: Dict[str, str]) -> 'StatusType':
+        if not cls._path == path:
+            return PosUrl.StatusType.UNDEFINED
+        if not cls._check_utm_params(params):
+            return PosUrl.StatusType.UTM_INVALID
+        return cls._get_url_status_type(url)
+
+    @classmethod
+    def _get_url_status_type(cls, url: str) -> 'StatusType':
+        if cls.SPACERS_REGEX.search(url) is not None:
+            return PosUrl.StatusType.SPACER
+        if cls.TEMPLATE_REGEX.fullmatch(url) is None:
+            return PosUrl.StatusType.NOT_MATCH
+        return PosUrl.StatusType.VALID
+
+    @classmethod
+    def _check_utm_params(cls, params: Dict[str, str]) -> bool:
+        for param, utm_code in cls.UTM_CODES.items():
+            value = params.get(param)
+            if value is None or not utm_code.match(value):
+                return False
+
+        for param, value in params.items():
+            if param and value and param not in cls.UTM_CODES:
+                return False
+
+        return True
+
     def validate(self, path: str, params: Dict[str, str]) -> 'PosUrl':
         if not self._path == path:
             self.status_type = PosUrl.StatusType.UNDEFINED
         elif not self._check_utm_codes(params):
             self.status_type = PosUrl.StatusType.UTM_INVALID
-        elif not self._check_spacers():
-            self.status_type = PosUrl.StatusType.SPACER
-        elif not self._check_pos_link_template():
-            self.status_type = PosUrl.StatusType.NOT_MATCH
         else:
-            self.status_type = PosUrl.StatusType.VALID
+            self.status_type = self._get_url_status_type(self.url)
         return self
 
     def _check_utm_codes(self, params: Dict[str, str]) -> bool:
+        for param, utm_code in self._utm_codes.items():
+            value = params.get(param)
+            if value is not None:
+                utm_code.param = param
+                utm_code.value = value
+
         for param, value in params.items():
-            if param in self._utm_codes:
-                utm_code = self._utm_codes[param]
-            else:
+            if param and value and param not in self._utm_codes:
                 utm_code = UTMCode(code='UNDEFINED')
-
-            utm_code.param = param
-            utm_code.value = value
-            if param and value:
+                utm_code.param = param
+                utm_code.value = value
                 self._utm_codes[param] = utm_code
 
-        return all([code.is_valid for code in self._utm_codes.values()])
-
-    def _check_spacers(self) -> bool:
-        pattern = re.compile(self.SPACERS_PATTERN)
-        match = re.findall(pattern, self.url)
-        if not match:
-            return True
-
-    def _check_pos_link_template(self) -> bool:
-        pattern = re.compile(self.TEMPLATE_PATTERN)
-        match = re.fullmatch(pattern, self.url)
-        if match:
-            return True
+        return all(utm_code.is_valid for utm_code in self._utm_codes.values())
 
     def __init__(self, url: str):
         self.__url = url
+        self._utm_codes = {param: utm_code.copy() for param, utm_code in self.UTM_CODES.items()}
 
     @property
     def url(self) -> str:
         return self.__url
 
+    def to_dict(self) -> dict:
+        return dict(
+            url=self.url,
+            source=self._source.value,
+            status_type=self.status_type.name,
+            utm_codes={param: code.to_list() for param, code in self._utm_codes.items()}
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'PosUrl':
+        pos_url_type = PosWidget.POS_URL_TYPES[Source.get_by_value(data['source'])]
+        pos_url = pos_url_type.__new__(pos_url_type)
+        pos_url.__url = data['url']
+        pos_url.status_type = cls.StatusType[data['status_type']]
+        pos_url._utm_codes = {
+            param: UTMCode.from_list(code, pos_url_type.UTM_CODES.get(param))
+            for param, code in data['utm_codes'].items()
+        }
+        return pos_url
+
     def __str__(self) -> str:
         return f'<{self.__class__.__name__} ' \
                f'status_types={self.status_type}, ' \
@@ -253,45 +374,42 @@ class PosUrl:
 
 
 class FormUrl(PosUrl):
+    __slots__ = ()
     _path = 'form'
     _source: Source = Source.VK
 
-    def __init__(self, url: str):
-        super().__init__(url=url)
-        self._utm_codes = {
-            'opaId': OpaId(),
-            'utm_source': UTMCode(code='SOURCE', hint=f'{self._source!r} expected', pattern=self._source.value),
-            'utm_medium': RegCode(),
-            'utm_campaign': OgrnCode()
-        }
+    UTM_CODES = {
+        'opaId': OpaId(),
+        'utm_source': UTMCode(code='SOURCE', hint=f'{_source!r} expected', pattern=_source.value),
+        'utm_medium': RegCode(),
+        'utm_campaign': OgrnCode()
+    }
 
 
 class RoivUrl(PosUrl):
+    __slots__ = ()
     _path = 'og/org-activities'
     _source: Source = Source.VK1
 
-    def __init__(self, url: str):
-        super().__init__(url=url)
-        self._utm_codes = {
-            'reg_code': RegCode(),
-            'utm_source': UTMCode(code='SOURCE', hint=f'{self._source!r} expected', pattern=self._source.value),
-            'utm_medium': RegCode(),
-            'utm_campaign': OgrnCode()
-        }
+    UTM_CODES = {
+        'reg_code': RegCode(),
+        'utm_source': UTMCode(code='SOURCE', hint=f'{_source!r} expected', pattern=_source.value),
+        'utm_medium': RegCode(),
+        'utm_campaign': OgrnCode()
+    }
 
 
 class OmsuUrl(PosUrl):
+    __slots__ = ()
     _path = 'og/org-activities'
     _source: Source = Source.VK2
 
-    def __init__(self, url: str):
-        super().__init__(url=url)
-        self._utm_codes = {
-            'mun_code': MunCode(),
-            'utm_source': UTMCode(code='utm_source', hint=f'{self._source!r} expected', pattern=self._source.value),
-            'utm_medium': RegCode(),
-            'utm_campaign': OgrnCode()
-        }
+    UTM_CODES = {
+        'mun_code': MunCode(),
+        'utm_source': UTMCode(code='utm_source', hint=f'{_source!r} expected', pattern=_source.value),
+        'utm_medium': RegCode(),
+        'utm_campaign': OgrnCode()
+    }
 
 
 class PosWidget:
@@ -315,8 +433,23 @@ class PosWidget:
         def __str__(self) -> str:
             return CONFIG.display.result_types.pattern.format(**self.value)
 
-    urls: List[PosUrl] = []
-    result: ResultType = ResultType.ERROR
+    INVALID_STATUS_TYPES = frozenset((
+        PosUrl.StatusType.NOT_MATCH,
+        PosUrl.StatusType.UTM_INVALID,
+        PosUrl.StatusType.SPACER,
+        PosUrl.StatusType.UNDEFINED
+    ))
+
+    __slots__ = ('urls', 'result')
+
+    POS_URLS_CACHE: Union['PosUrlsCache', None] = None
+
+    urls: List[PosUrl]
+    result: ResultType
+
+    def __init__(self) -> None:
+        self.urls = []
+        self.result = self.ResultType.ERROR
 
     @classmethod
     def extract_url_params(cls, url: str) -> Tuple[str, Dict]:
@@ -338,18 +471,53 @@ class PosWidget:
         self.result = self._get_result()
         return self
 
-    def get_validated_pos_url(self, item: Dict) -> PosUrl:
-        url = item['url']
-        path, params = self.extract_url_params(url)
+    @classmethod
+    def get_pos_url_type(cls, params: Dict[str, str]) -> Type[PosUrl]:
         utm_source = params.get('utm_source')
         if utm_source:
-            source = Source.get_by_value(utm_source)
-            pos_url = self.POS_URL_TYPES[source](url=url)
-        else:
-            pos_url = PosUrl(url)
+            return cls.POS_URL_TYPES[Source.get_by_value(utm_source)]
+        return PosUrl
+
+    @classmethod
+    def validate_many(cls, urls: Iterable[str]) -> List[PosUrl.StatusType]:
+        statuses = []
+        for url in urls:
+            path, params = cls.extract_url_params(url)
+            statuses.append(cls.get_pos_url_type(params).get_status_type(url, path, params))
+        return statuses
+
+    def get_validated_pos_url(self, item: Dict) -> PosUrl:
+        url = item['url']
+        cache = self.POS_URLS_CACHE
+        if cache is None:
+            return self.validate_pos_url(url)
+
+        pos_url = cache.get(url)
+        if pos_url is None:
+            pos_url = self.validate_pos_url(url)
+            cache.put(url, pos_url)
+        return pos_url
+
+    @classmethod
+    def validate_pos_url(cls, url: str) -> PosUrl:
+        path, params = cls.extract_url_params(url)
+        pos_url = cls.get_pos_url_type(params)(url=url)
         pos_url.validate(path, params)
         return pos_url
 
+    def to_dict(self) -> dict:
+        return dict(
+            result=self.result.name,
+            urls=[pos_url.to_dict() for pos_url in self.urls]
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'PosWidget':
+        pos_widget = cls()
+        pos_widget.urls = [PosUrl.from_dict(pos_url) for pos_url in data['urls']]
+        pos_widget.result = cls.ResultType[data['result']]
+        return pos_widget
+
     def _get_result(self, urls: List[PosUrl] = None) -> ResultType:
         urls = self.urls if not urls else urls
 
@@ -359,17 +527,60 @@ class PosWidget:
         if CONFIG.parsing.max_links_per_widget != 0 and len(urls) != CONFIG.parsing.max_links_per_widget:
             return self.ResultType.LINKS_COUNT
 
-        if all([pos_url.status_type == PosUrl.StatusType.VALID for pos_url in urls]):
+        if all(pos_url.status_type is PosUrl.StatusType.VALID for pos_url in urls):
             return self.ResultType.CORRECT
 
-        if len(list(filter(
-                lambda u: u.status_type in (
-                        PosUrl.StatusType.NOT_MATCH,
-                        PosUrl.StatusType.UTM_INVALID,
-                        PosUrl.StatusType.SPACER,
-                        PosUrl.StatusType.UNDEFINED
-                ), urls
-        ))) > 0:
+        if any(pos_url.status_type in self.INVALID_STATUS_TYPES for pos_url in urls):
             return self.ResultType.INVALID
 
         return self.ResultType.ERROR
+
+
+class PosUrlsCache:
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.rules = self.get_rules()
+        self.hits = 0
+        self.misses = 0
+        self.__pos_urls = OrderedDict()
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def get_rules(cls) -> str:
+        rules = [PosUrl.TEMPLATE_PATTERN, PosUrl.SPACERS_PATTERN] + [
+            [
+                source.name,
+                pos_url_type._path,
+                {param: [utm_code.code, utm_code.pattern] for param, utm_code in pos_url_type.UTM_CODES.items()}
+            ]
+            for source, pos_url_type in PosWidget.POS_URL_TYPES.items()
+        ]
+        return hashlib.sha1(json.dumps(rules, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def get(self, url: str) -> Union[PosUrl, None]:
+        with self.__lock:
+            pos_url = self.__pos_urls.get(url)
+            if pos_url is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.__pos_urls.move_to_end(url)
+            return pos_url
+
+    def put(self, url: str, pos_url: PosUrl) -> None:
+        with self.__lock:
+            self.__pos_urls[url] = pos_url
+            self.__pos_urls.move_to_end(url)
+            if len(self.__pos_urls) > self.max_size:
+                self.__pos_urls.popitem(last=False)
+
+    def items(self) -> List[Tuple[str, PosUrl]]:
+        with self.__lock:
+            return list(self.__pos_urls.items())
+
+    def count(self) -> int:
+        return len(self.__pos_urls)
+
+
+if CONFIG.pos_urls_cache.enabled and CONFIG.pos_urls_cache.max_size > 0:
+    PosWidget.POS_URLS_CACHE = PosUrlsCache(max_size=CONFIG.pos_urls_cache.max_size)
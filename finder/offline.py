@@ -0,0 +1,84 @@
+import functools
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, Iterator, List, Tuple, Union
+
+from configs import CONFIG, get_logger, summarize
+from helpers import RunMetrics, split_list
+from .archive import PublicsArchive
+from .models import PosWidget, Public
+
+if TYPE_CHECKING:
+    from main import PublicsFetch, WidgetFinder
+
+logger = get_logger(__name__)
+
+REQUIRED_FIELDS = ('id', 'screen_name')
+
+
+def check_archived_publics(publics_data: List[bytes], fields: Tuple[str, ...] = None) -> List[Tuple[dict, dict]]:
+    result = []
+    for data in publics_data:
+        public_data = PublicsArchive.decode(data)
+        pos_widget = PosWidget().parse_data(public_data).to_dict()
+        if fields:
+            public_data = {field: value for field, value in public_data.items() if field in fields}
+        result.append((public_data, pos_widget))
+    return result
+
+
+def iter_archived_checks(
+        publics_data: List[bytes],
+        fields: List[str] = None,
+        processes: int = None,
+        chunk_size: int = 1000
+) -> Iterator[List[Tuple[dict, dict]]]:
+    check = functools.partial(check_archived_publics, fields=(*REQUIRED_FIELDS, *fields) if fields else None)
+    chunks = split_list(publics_data, chunk_size)
+    if processes == 1 or len(chunks) < 2:
+        yield from map(check, chunks)
+        return
+
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn')) as executor:
+        yield from executor.map(check, chunks)
+
+
+def fetch_archived_publics(archive: PublicsArchive, metrics: RunMetrics, processes: int = None) -> 'PublicsFetch':
+    def fetch(publics: Dict[str, Public]) -> Iterator[Tuple[List[Union[dict, Public]], Union[Dict[int, dict], None]]]:
+        with metrics.timer('read'):
+            publics_data = archive.get_many(publics, raw=True)
+        missing = [p for identify, p in publics.items() if identify not in publics_data]
+        if missing:
+            logger.warning('%d publics not found in archive %r, mark them as %s: %s', len(missing),
+                           archive.path, PosWidget.ResultType.ERROR.name, summarize([p.url for p in missing]))
+            metrics.increment('archive_misses', len(missing))
+            for p in missing:
+                p.pos_widget.result = PosWidget.ResultType.ERROR
+            yield missing, None
+
+        display_fields = [field.split('.')[0] for field in CONFIG.display.public_display_fields]
+        checked = iter_archived_checks(list(publics_data.values()), display_fields, processes)
+        for checks in metrics.timed_iter('parse', checked):
+            yield (
+                [public_data for public_data, _ in checks],
+                {public_data['id']: pos_widget for public_data, pos_widget in checks}
+            )
+
+    return fetch
+
+
+def process_publics_offline(finder: 'WidgetFinder', processes: int = None) -> None:
+    logger.info('Start offline processing:')
+    print('Start offline processing:')
+    if not os.path.exists(CONFIG.paths.archive_file):
+        sys.exit(f'Archive {CONFIG.paths.archive_file!r} not found, run with parsing.save_public_data first')
+
+    archive = PublicsArchive(path=CONFIG.paths.archive_file)
+    try:
+        finder.check_publics(finder.publics, fetch=fetch_archived_publics(archive, finder.metrics, processes),
+                             progress=True)
+    finally:
+        archive.close()
+    logger.info(f'Processing complete! {finder.counters}')
@@ -0,0 +1,44 @@
+import json
+import sqlite3
+
+from configs import get_logger
+from .models import PosUrl, PosUrlsCache
+
+logger = get_logger(__name__)
+
+
+class PosUrlsStore:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.__connection = sqlite3.connect(path)
+        self.__connection.execute(
+            'CREATE TABLE IF NOT EXISTS pos_urls ('
+            'url TEXT PRIMARY KEY, '
+            'rules TEXT NOT NULL, '
+            'pos_url TEXT NOT NULL)'
+        )
+        self.__connection.commit()
+
+    def load(self, cache: PosUrlsCache) -> None:
+        rows = self.__connection.execute(
+            'SELECT url, pos_url FROM pos_urls WHERE rules = ? ORDER BY rowid DESC LIMIT ?',
+            (cache.rules, cache.max_size)
+        ).fetchall()
+        for url, pos_url in reversed(rows):
+            cache.put(url, PosUrl.from_dict(json.loads(pos_url)))
+        logger.info(f'Loaded {len(rows)} validated POS urls from {self.path!r}')
+
+    def save(self, cache: PosUrlsCache) -> None:
+        self.__connection.execute('DELETE FROM pos_urls')
+        self.__connection.executemany(
+            'INSERT INTO pos_urls (url, rules, pos_url) VALUES (?, ?, ?)',
+            [
+                (url, cache.rules, json.dumps(pos_url.to_dict(), ensure_ascii=False))
+                for url, pos_url in cache.items()
+            ]
+        )
+        self.__connection.commit()
+        logger.info(f'Saved {cache.count()} validated POS urls to {self.path!r}')
+
+    def close(self) -> None:
+        self.__connection.close()
@@ -0,0 +1,44 @@
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from configs import get_logger
+from helpers import split_list
+
+logger = get_logger(__name__)
+
+
+class IdsResolver:
+    def __init__(self, path: str) -> None:
+        self.__connection = sqlite3.connect(path)
+        self.__connection.execute(
+            'CREATE TABLE IF NOT EXISTS screen_names ('
+            'screen_name TEXT PRIMARY KEY, '
+            'id INTEGER NOT NULL, '
+            'resolved_at REAL NOT NULL)'
+        )
+        self.__connection.commit()
+
+    def get_many(self, screen_names: Iterable[str]) -> Dict[str, int]:
+        result = {}
+        screen_names: List[str] = list(screen_names)
+        for chunk in split_list(screen_names, 500):
+            rows = self.__connection.execute(
+                f'SELECT screen_name, id FROM screen_names WHERE screen_name IN ({",".join("?" * len(chunk))})',
+                chunk
+            ).fetchall()
+            result.update(rows)
+
+        logger.info(f'Resolved {len(result)} of {len(screen_names)} screen names to ids')
+        return result
+
+    def put_many(self, screen_names: Iterable[Tuple[str, int]]) -> None:
+        resolved_at = time.time()
+        self.__connection.executemany(
+            'INSERT OR REPLACE INTO screen_names (screen_name, id, resolved_at) VALUES (?, ?, ?)',
+            [(screen_name, group_id, resolved_at) for screen_name, group_id in screen_names]
+        )
+        self.__connection.commit()
+
+    def close(self) -> None:
+        self.__connection.close()
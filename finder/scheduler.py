@@ -0,0 +1,156 @@
+import json
+import math
+import random
+import signal
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Union
+
+from configs import CONFIG, get_logger
+from helpers import TokenBucket
+from .models import Public
+
+if TYPE_CHECKING:
+    from main import WidgetFinder
+
+logger = get_logger(__name__)
+
+
+class ChecksQueue:
+    def __init__(self, path: str, intervals: Dict[str, float], jitter: float = .1) -> None:
+        self.intervals = intervals
+        self.jitter = jitter
+        self.__connection = sqlite3.connect(path)
+        self.__connection.execute(
+            'CREATE TABLE IF NOT EXISTS queue ('
+            'url TEXT PRIMARY KEY, '
+            'due_at REAL NOT NULL, '
+            'result TEXT, '
+            'checked_at REAL, '
+            'data TEXT, '
+            'pos_widget TEXT)'
+        )
+        self.__connection.execute('CREATE INDEX IF NOT EXISTS queue_due_at ON queue (due_at)')
+        self.__connection.commit()
+
+    def sync(self, urls: Iterable[str]) -> None:
+        urls = set(urls)
+        queued = {url for url, in self.__connection.execute('SELECT url FROM queue')}
+        added = urls - queued
+        removed = queued - urls
+        self.__connection.executemany('INSERT INTO queue (url, due_at) VALUES (?, 0)', [(url,) for url in added])
+        self.__connection.executemany('DELETE FROM queue WHERE url = ?', [(url,) for url in removed])
+        self.__connection.commit()
+        if added or removed:
+            logger.info(f'Queue synced with target file: {len(added)} added, {len(removed)} removed')
+
+    def get_due(self, limit: int, now: float = None) -> List[str]:
+        rows = self.__connection.execute(
+            'SELECT url FROM queue WHERE due_at <= ? ORDER BY due_at LIMIT ?',
+            (time.time() if now is None else now, limit)
+        ).fetchall()
+        return [url for url, in rows]
+
+    def next_due_at(self) -> Union[float, None]:
+        return self.__connection.execute('SELECT MIN(due_at) FROM queue').fetchone()[0]
+
+    def get_interval(self, result: str) -> float:
+        interval = self.intervals.get(result, 0)
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def put_results(self, publics: Iterable[Public], fields: Iterable[str]) -> None:
+        fields = set(fields)
+        checked_at = time.time()
+        self.__connection.executemany(
+            'UPDATE queue SET due_at = ?, result = ?, checked_at = ?, data = ?, pos_widget = ? WHERE url = ?',
+            [
+                (
+                    checked_at + self.get_interval(public.pos_widget.result.name),
+                    public.pos_widget.result.name,
+                    checked_at,
+                    json.dumps({k: v for k, v in public.data.items() if k in fields}, ensure_ascii=False),
+                    json.dumps(public.pos_widget.to_dict(), ensure_ascii=False),
+                    public.url
+                )
+                for public in publics
+            ]
+        )
+        self.__connection.commit()
+
+    def iter_publics(self) -> Iterator[Public]:
+        rows = self.__connection.execute('SELECT url, data, pos_widget FROM queue WHERE pos_widget IS NOT NULL')
+        for url, data, pos_widget in rows:
+            yield Public(url).restore(json.loads(data), json.loads(pos_widget))
+
+    def count_results(self) -> Dict[str, int]:
+        rows = self.__connection.execute('SELECT COALESCE(result, \'QUEUED\'), COUNT(*) FROM queue GROUP BY result')
+        return dict(rows.fetchall())
+
+    def close(self) -> None:
+        self.__connection.close()
+
+
+class ChecksDaemon:
+    def __init__(self, finder: 'WidgetFinder') -> None:
+        self.finder = finder
+        self.__stop = threading.Event()
+
+    def run(self) -> None:
+        logger.info('Start daemon:')
+        print(f'Start daemon, queue {CONFIG.paths.queue_file!r}, press Ctrl+C to stop')
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *args: self.stop())
+
+        self.__stop.clear()
+        queue = ChecksQueue(CONFIG.paths.queue_file, CONFIG.daemon.intervals, CONFIG.daemon.jitter)
+        budget = TokenBucket(
+            rate=CONFIG.daemon.requests_per_day / 86400,
+            capacity=self.finder.get_requests_count(CONFIG.daemon.batch_size)
+        )
+        fields = self.finder.get_stored_fields()
+        reload_at = report_at = 0.
+        try:
+            while not self.__stop.is_set():
+                now = time.time()
+                if now >= reload_at:
+                    urls = self.finder.read_target_urls()
+                    if urls is not None:
+                        queue.sync(urls)
+                    reload_at = now + CONFIG.daemon.reload_interval
+
+                urls = queue.get_due(CONFIG.daemon.batch_size, now)
+                wait = budget.try_acquire(self.finder.get_requests_count(len(urls))) if urls else 0.
+                if urls and not wait:
+                    publics = {url: Public(url) for url in urls}
+                    self.finder.reset_counters()
+                    self.finder.check_publics(publics)
+                    queue.put_results(publics.values(), fields)
+                    logger.info(f'Checked {len(urls)} due publics, queue: {queue.count_results()}')
+
+                if now >= report_at:
+                    self.save_report(queue)
+                    report_at = now + CONFIG.daemon.report_interval
+
+                if not urls or wait:
+                    next_due_at = queue.next_due_at()
+                    wake_at = min(reload_at, report_at, next_due_at if next_due_at is not None else math.inf)
+                    self.__stop.wait(max(wait, min(wake_at - time.time(), CONFIG.daemon.reload_interval), .1))
+        except KeyboardInterrupt:
+            logger.info('Daemon interrupted')
+        finally:
+            self.save_report(queue)
+            queue.close()
+            self.finder.close()
+        print('Daemon stopped')
+
+    def stop(self) -> None:
+        self.__stop.set()
+
+    def save_report(self, queue: ChecksQueue) -> None:
+        publics = list(queue.iter_publics())
+        if publics:
+            self.finder.save_results(publics)
+        for result, count in queue.count_results().items():
+            self.finder.metrics.set_gauge(f'queue_{result.lower()}', count)
+        self.finder.save_report()
@@ -0,0 +1,288 @@
+import json
+import signal
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Union
+from urllib.parse import parse_qs, urlparse
+
+from configs import CONFIG, get_logger
+from helpers import RunMetrics
+
+if TYPE_CHECKING:
+    from main import WidgetFinder
+
+logger = get_logger(__name__)
+
+
+class AnswersCache:
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.__answers = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get_many(self, urls: Iterable[str]) -> Dict[str, dict]:
+        result = {}
+        expired_at = time.monotonic() - self.ttl
+        with self.__lock:
+            for url in urls:
+                item = self.__answers.get(url)
+                if item is None:
+                    continue
+                cached_at, answer = item
+                if cached_at < expired_at:
+                    del self.__answers[url]
+                else:
+                    result[url] = answer
+        return result
+
+    def put_many(self, answers: Dict[str, dict]) -> None:
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+
+        cached_at = time.monotonic()
+        with self.__lock:
+            for url, answer in answers.items():
+                self.__answers.pop(url, None)
+                self.__answers[url] = (cached_at, answer)
+            while len(self.__answers) > self.max_size:
+                self.__answers.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.__answers)
+
+
+class MicroBatcher:
+    def __init__(self, check: Callable[[List[str]], Dict[str, dict]], batch_size: int, window: float) -> None:
+        self.check = check
+        self.batch_size = batch_size
+        self.window = window
+        self.__pending: Dict[str, List[Future]] = {}
+        self.__first_at = None
+        self.__stopped = False
+        self.__condition = threading.Condition()
+
+    def submit_many(self, urls: Iterable[str]) -> List[Future]:
+        futures = []
+        with self.__condition:
+            if self.__stopped:
+                raise RuntimeError('Validation service is stopped')
+            for url in urls:
+                future = Future()
+                self.__pending.setdefault(url, []).append(future)
+                futures.append(future)
+            if self.__first_at is None and self.__pending:
+                self.__first_at = time.monotonic()
+            self.__condition.notify()
+        return futures
+
+    def __get_batch(self) -> Union[Dict[str, List[Future]], None]:
+        with self.__condition:
+            while not self.__pending and not self.__stopped:
+                self.__condition.wait()
+            while len(self.__pending) < self.batch_size and not self.__stopped:
+                timeout = self.__first_at + self.window - time.monotonic()
+                if timeout <= 0:
+                    break
+                self.__condition.wait(timeout)
+            if self.__stopped:
+                return None
+
+            batch = {url: self.__pending.pop(url) for url in list(islice(self.__pending, self.batch_size))}
+            if not self.__pending:
+                self.__first_at = None
+            return batch
+
+    def run(self) -> None:
+        while True:
+            batch = self.__get_batch()
+            if batch is None:
+                break
+
+            logger.debug(f'Check batch of {len(batch)} urls')
+            try:
+                answers = self.check(list(batch))
+            except BaseException as e:
+                logger.exception(f'Failed to check batch of {len(batch)} urls')
+                for futures in batch.values():
+                    for future in futures:
+                        future.set_exception(e)
+                if not isinstance(e, Exception):
+                    raise
+                continue
+
+            for url, futures in batch.items():
+                for future in futures:
+                    if url in answers:
+                        future.set_result(answers[url])
+                    else:
+                        future.set_exception(KeyError(url))
+
+        with self.__condition:
+            for futures in self.__pending.values():
+                for future in futures:
+                    future.cancel()
+            self.__pending = {}
+
+    def stop(self) -> None:
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify_all()
+
+
+class ValidationHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: 'ValidationServer'
+
+    def do_GET(self) -> None:
+        parsed_url = urlparse(self.path)
+        if parsed_url.path == '/validate':
+            urls = parse_qs(parsed_url.query).get('url')
+            if not urls:
+                return self.send_json(400, dict(error='Provide the public url: /validate?url=https://vk.com/...'))
+            return self.validate(urls, bulk=len(urls) > 1)
+        if parsed_url.path == '/stats':
+            return self.send_json(200, self.server.get_stats())
+        return self.send_json(404, dict(error=f'Unknown path {parsed_url.path!r}'))
+
+    def do_POST(self) -> None:
+        if urlparse(self.path).path != '/validate':
+            return self.send_json(404, dict(error=f'Unknown path {self.path!r}'))
+
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            body = json.loads(self.rfile.read(length).decode('utf-8'))
+        except ValueError:
+            return self.send_json(400, dict(error='Request body is not a valid JSON'))
+
+        urls = body.get('urls') if isinstance(body, dict) else body
+        if not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+            return self.send_json(400, dict(error='Provide the list of public urls: {"urls": [...]}'))
+        if len(urls) > self.server.max_urls:
+            return self.send_json(413, dict(error=f'Too many urls, max {self.server.max_urls} per request'))
+        return self.validate(urls, bulk=True)
+
+    def validate(self, urls: List[str], bulk: bool) -> None:
+        try:
+            answers = self.server.validate_many(urls)
+        except TimeoutError:
+            return self.send_json(504, dict(error='Publics were not checked in time, try again later'))
+        except BaseException as e:
+            return self.send_json(502, dict(error=f'{type(e).__name__}: {e}'))
+        return self.send_json(200, dict(results=answers) if bulk else answers[0])
+
+    def send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug('%s ' + format, self.address_string(), *args)
+
+
+class ValidationServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(
+            self,
+            batcher: MicroBatcher,
+            cache: AnswersCache,
+            clean_url: Callable[[str], str],
+            metrics: RunMetrics,
+            host: str = '127.0.0.1',
+            port: int = 8000,
+            timeout: float = 60.,
+            max_urls: int = 10000
+    ) -> None:
+        super().__init__((host, port), ValidationHandler)
+        self.batcher = batcher
+        self.cache = cache
+        self.clean_url = clean_url
+        self.metrics = metrics
+        self.timeout = timeout
+        self.max_urls = max_urls
+        self.__thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'ValidationServer':
+        self.__thread = threading.Thread(target=self.serve_forever, name='validation-server', daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self.__thread:
+            self.__thread.join()
+
+    def validate_many(self, urls: List[str]) -> List[dict]:
+        started = time.perf_counter()
+        urls = [self.clean_url(url) for url in urls]
+        answers = self.cache.get_many(urls)
+        missed = list(dict.fromkeys(url for url in urls if url not in answers))
+        self.metrics.increment('cache_hits', len(urls) - len(missed))
+        self.metrics.increment('cache_misses', len(missed))
+
+        if missed:
+            futures = self.batcher.submit_many(missed)
+            deadline = time.monotonic() + self.timeout
+            checked = {
+                url: future.result(timeout=max(deadline - time.monotonic(), 0))
+                for url, future in zip(missed, futures)
+            }
+            self.cache.put_many({url: answer for url, answer in checked.items() if answer['result'] != 'TIMEOUT'})
+            answers.update(checked)
+
+        self.metrics.increment('validate_requests')
+        self.metrics.observe('validate_seconds', time.perf_counter() - started)
+        return [answers[url] for url in urls]
+
+    def get_stats(self) -> dict:
+        return dict(cached_answers=len(self.cache), **self.metrics.to_dict())
+
+
+def create_service(finder: 'WidgetFinder') -> ValidationServer:
+    return ValidationServer(
+        batcher=MicroBatcher(finder.check_urls, CONFIG.service.batch_size, CONFIG.service.batch_window),
+        cache=AnswersCache(ttl=CONFIG.service.cache_ttl, max_size=CONFIG.service.cache_size),
+        clean_url=finder.clean_url,
+        metrics=finder.metrics,
+        host=CONFIG.service.host,
+        port=CONFIG.service.port,
+        timeout=CONFIG.service.timeout,
+        max_urls=CONFIG.service.max_urls
+    )
+
+
+def run_service(finder: 'WidgetFinder', server: ValidationServer = None) -> None:
+    logger.info('Start validation service:')
+    finder.fail_fast = CONFIG.service.fail_fast
+    server = server or create_service(finder)
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda *args: server.batcher.stop())
+
+    server.start()
+    logger.info(f'Validation service listening on {server.url}')
+    print(f'Validation service listening on {server.url}, press Ctrl+C to stop')
+    try:
+        server.batcher.run()
+    except KeyboardInterrupt:
+        logger.info('Validation service interrupted')
+    finally:
+        server.batcher.stop()
+        server.stop()
+        finder.close()
+        finder.save_report()
+    print('Validation service stopped')
@@ -0,0 +1,57 @@
+import hashlib
+import json
+import sqlite3
+from typing import Dict, Iterable, Tuple
+
+from configs import get_logger, CONFIG
+from .models import PosUrl
+
+logger = get_logger(__name__)
+
+
+class ChecksState:
+    def __init__(self, path: str) -> None:
+        self.rules = json.dumps([
+            dict(CONFIG.parsing.utm_codes_regex),
+            CONFIG.parsing.max_links_per_widget,
+            PosUrl.TEMPLATE_PATTERN,
+            PosUrl.SPACERS_PATTERN
+        ], sort_keys=True)
+        self.__connection = sqlite3.connect(path)
+        self.__connection.execute(
+            'CREATE TABLE IF NOT EXISTS checks ('
+            'id INTEGER PRIMARY KEY, '
+            'digest TEXT NOT NULL, '
+            'pos_widget TEXT NOT NULL)'
+        )
+        self.__connection.commit()
+
+    def digest(self, public_data: dict) -> str:
+        menu = json.dumps(public_data.get('menu'), ensure_ascii=False, sort_keys=True)
+        return hashlib.sha1(f'{self.rules}\n{menu}'.encode('utf-8')).hexdigest()
+
+    def get_many(self, publics_data: Iterable[dict]) -> Dict[int, dict]:
+        result = {}
+        for public_data in publics_data:
+            row = self.__connection.execute(
+                'SELECT pos_widget FROM checks WHERE id = ? AND digest = ?',
+                (public_data['id'], self.digest(public_data))
+            ).fetchone()
+            if row:
+                result[public_data['id']] = json.loads(row[0])
+
+        logger.debug(f'Found {len(result)} unchanged publics')
+        return result
+
+    def put_many(self, checks: Iterable[Tuple[dict, dict]]) -> None:
+        self.__connection.executemany(
+            'INSERT OR REPLACE INTO checks (id, digest, pos_widget) VALUES (?, ?, ?)',
+            [
+                (public_data['id'], self.digest(public_data), json.dumps(pos_widget, ensure_ascii=False))
+                for public_data, pos_widget in checks
+            ]
+        )
+        self.__connection.commit()
+
+    def close(self) -> None:
+        self.__connection.close()
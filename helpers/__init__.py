@@ -1 +1,6 @@
-from .utils import split_dict_by_keys, get_path
+from .utils import split_dict_by_keys, split_list, get_path, override, parse_identify
+from .rate_limiter import TokenBucket
+from .writers import RowWriter, ROW_WRITERS, get_row_writer
+from .metrics import Histogram, RunMetrics
+from .progress import Progress, PROGRESS_MODES
+from .retry import Backoff, CircuitBreaker, CircuitOpenError
@@ -0,0 +1,139 @@
+import bisect
+import contextlib
+import json
+import threading
+import time
+from collections import defaultdict
+from typing import Iterable, Iterator, List, Tuple
+
+DEFAULT_BUCKETS = (.05, .1, .25, .5, 1., 2.5, 5., 10., 30., 60.)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.
+        self.count = 0
+        self.max = 0.
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        result = []
+        total = 0
+        for bucket, count in zip([*map(str, self.buckets), '+Inf'], self.counts):
+            total += count
+            result.append((bucket, total))
+        return result
+
+    def to_dict(self) -> dict:
+        return dict(
+            count=self.count,
+            sum=round(self.sum, 6),
+            max=round(self.max, 6),
+            buckets=dict(self.cumulative()),
+        )
+
+
+class RunMetrics:
+    PREFIX = 'find_pos_widgets'
+
+    def __init__(self) -> None:
+        self.started_at = time.time()
+        self.stages = defaultdict(float)
+        self.counters = defaultdict(int)
+        self.histograms = defaultdict(Histogram)
+        self.gauges = {}
+        self._lock = threading.Lock()
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[stage] += seconds
+
+    @contextlib.contextmanager
+    def timer(self, stage: str, exclude: str = None) -> Iterator[None]:
+        excluded = self.stages.get(exclude, 0.)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if exclude:
+                elapsed -= self.stages.get(exclude, 0.) - excluded
+            self.add_time(stage, elapsed)
+
+    def timed_iter(self, stage: str, iterable: Iterable) -> Iterator:
+        iterator = iter(iterable)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_time(stage, time.perf_counter() - started)
+                return
+            self.add_time(stage, time.perf_counter() - started)
+            yield item
+
+    def increment(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            self.histograms[name].observe(value)
+
+    def set_gauge(self, name: str, value: float) -> None:
+        self.gauges[name] = value
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return dict(
+                started_at=self.started_at,
+                duration=round(time.time() - self.started_at, 6),
+                stages={stage: round(seconds, 6) for stage, seconds in self.stages.items()},
+                counters=dict(self.counters),
+                histograms={name: histogram.to_dict() for name, histogram in self.histograms.items()},
+                gauges=dict(self.gauges),
+            )
+
+    def save_json(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=4)
+
+    def to_prometheus(self) -> str:
+        report = self.to_dict()
+        prefix = self.PREFIX
+        lines = [
+            f'# TYPE {prefix}_duration_seconds gauge',
+            f'{prefix}_duration_seconds {report["duration"]}',
+            f'# TYPE {prefix}_stage_seconds gauge',
+        ]
+        lines.extend(
+            f'{prefix}_stage_seconds{{stage="{stage}"}} {seconds}' for stage, seconds in report['stages'].items()
+        )
+
+        for name, value in report['counters'].items():
+            lines.append(f'# TYPE {prefix}_{name}_total counter')
+            lines.append(f'{prefix}_{name}_total {value}')
+
+        for name, value in report['gauges'].items():
+            lines.append(f'# TYPE {prefix}_{name} gauge')
+            lines.append(f'{prefix}_{name} {value}')
+
+        for name, histogram in report['histograms'].items():
+            lines.append(f'# TYPE {prefix}_{name} histogram')
+            lines.extend(f'{prefix}_{name}_bucket{{le="{le}"}} {count}' for le, count in histogram['buckets'].items())
+            lines.append(f'{prefix}_{name}_sum {histogram["sum"]}')
+            lines.append(f'{prefix}_{name}_count {histogram["count"]}')
+
+        return '\n'.join(lines) + '\n'
+
+    def save_prometheus(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+
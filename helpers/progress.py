@@ -0,0 +1,94 @@
+import json
+import sys
+import time
+from datetime import datetime
+from typing import Dict, TextIO
+
+PROGRESS_MODES = ('auto', 'bar', 'json', 'quiet')
+
+
+class Progress:
+    def __init__(
+            self,
+            total: int = None,
+            mode: str = 'auto',
+            refresh_interval: float = .5,
+            log_interval: float = 10.,
+            desc: str = 'Processing',
+            unit: str = 'url',
+            stream: TextIO = None
+    ) -> None:
+        if mode not in PROGRESS_MODES:
+            raise ValueError(f'Unknown progress mode {mode!r}, expected one of: {", ".join(PROGRESS_MODES)}')
+
+        self.total = total
+        self.desc = desc
+        self.count = 0
+        self.counters = {}
+        self.stream = stream or sys.stderr
+        if mode == 'auto':
+            mode = 'bar' if self.stream.isatty() else 'json'
+        self.mode = mode
+        self.interval = refresh_interval if mode == 'bar' else log_interval
+        self.__started_at = time.monotonic()
+        self.__rendered_at = self.__started_at
+        self.__rendered_count = 0
+        self.__bar = None
+        if mode == 'bar':
+            from tqdm import tqdm
+
+            self.__bar = tqdm(
+                total=total,
+                file=self.stream,
+                ncols=150,
+                desc=desc,
+                unit=unit,
+                mininterval=refresh_interval,
+            )
+
+    def update(self, count: int, counters: Dict[str, int] = None) -> None:
+        self.count += count
+        if counters is not None:
+            self.counters = counters
+        if self.mode == 'quiet':
+            return
+
+        if self.__bar is not None:
+            self.__bar.set_postfix(self.counters, refresh=False)
+            self.__bar.update(count)
+            return
+
+        now = time.monotonic()
+        if now - self.__rendered_at >= self.interval:
+            self.__render(now)
+
+    def __render(self, now: float) -> None:
+        elapsed = now - self.__started_at
+        line = dict(
+            time=datetime.now().isoformat(timespec='seconds'),
+            desc=self.desc,
+            count=self.count,
+            total=self.total,
+            percent=round(self.count * 100 / self.total, 1) if self.total else None,
+            rate=round(self.count / elapsed, 1) if elapsed else None,
+            elapsed=round(elapsed, 3),
+            counters=self.counters,
+        )
+        self.stream.write(json.dumps(line) + '\n')
+        self.stream.flush()
+        self.__rendered_at = now
+        self.__rendered_count = self.count
+
+    def close(self) -> None:
+        if self.__bar is not None:
+            self.__bar.set_postfix(self.counters, refresh=False)
+            self.__bar.close()
+            self.__bar = None
+        elif self.mode == 'json' and self.count != self.__rendered_count:
+            self.__render(time.monotonic())
+
+    def __enter__(self) -> 'Progress':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -0,0 +1,79 @@
+import random
+import threading
+import time
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, remaining: float) -> None:
+        super().__init__(f'Circuit is open, next try in {remaining:.1f} sec')
+        self.remaining = remaining
+
+
+class Backoff:
+    def __init__(self, base: float = 5., factor: float = 2., max_delay: float = 60., jitter: bool = True) -> None:
+        self.base = base
+        self.factor = factor
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def get_delay(self, tries: int) -> float:
+        delay = min(self.max_delay, self.base * self.factor ** max(tries - 1, 0))
+        if self.jitter:
+            delay = delay / 2 + random.uniform(0, delay / 2)
+        return delay
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 10, reset_timeout: float = 30.) -> None:
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._probe = None
+        self._condition = threading.Condition()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    @property
+    def remaining(self) -> float:
+        opened_at = self._opened_at
+        if opened_at is None:
+            return 0.
+        return max(opened_at + self.reset_timeout - time.monotonic(), 0.)
+
+    def check(self, wait: bool = False) -> None:
+        with self._condition:
+            while self._opened_at is not None:
+                remaining = self.remaining
+                if remaining <= 0 and self._probe is None:
+                    self._probe = threading.get_ident()
+                    return
+                if not wait:
+                    raise CircuitOpenError(remaining)
+                self._condition.wait(remaining or None)
+
+    def release(self) -> None:
+        with self._condition:
+            if self._probe == threading.get_ident():
+                self._probe = None
+                self._condition.notify_all()
+
+    def record_success(self) -> None:
+        with self._condition:
+            self._failures = 0
+            self._opened_at = None
+            self._probe = None
+            self._condition.notify_all()
+
+    def record_failure(self) -> bool:
+        with self._condition:
+            self._failures += 1
+            if self._probe is not None or self._failures >= self.failure_threshold:
+                opened = self._opened_at is None
+                self._opened_at = time.monotonic()
+                self._probe = None
+                self._condition.notify_all()
+                return opened
+            return False
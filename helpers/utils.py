@@ -1,5 +1,9 @@
+import contextlib
 import os.path
-from typing import Dict, List
+import re
+from typing import Dict, List, Union
+
+ID_IDENTIFY_PATTERN = re.compile(r'(?:club|public|event)(\d+)')
 
 
 def split_dict_by_keys(target: Dict, max_count: int = 500) -> List[Dict]:
@@ -16,6 +20,27 @@ def split_dict_by_keys(target: Dict, max_count: int = 500) -> List[Dict]:
     return result
 
 
+def split_list(target: List, max_count: int = 25) -> List[List]:
+    return [target[i:i + max_count] for i in range(0, len(target), max_count)]
+
+
+def parse_identify(identify: str) -> Union[int, str]:
+    match = ID_IDENTIFY_PATTERN.fullmatch(identify)
+    return int(match.group(1)) if match else identify
+
+
+@contextlib.contextmanager
+def override(section: object, **values):
+    previous = {name: getattr(section, f'_{name}') for name in values}
+    for name, value in values.items():
+        object.__setattr__(section, f'_{name}', value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            object.__setattr__(section, f'_{name}', value)
+
+
 def get_path(path: str) -> str:
     path = os.path.abspath(os.path.join(os.getcwd(), path))
     dirname = os.path.dirname(path) if os.path.isfile(path) or '.' in os.path.basename(path) else path
@@ -0,0 +1,156 @@
+import csv
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Type
+
+
+class RowWriter(ABC):
+    def __init__(self, path: str, **options) -> None:
+        self.path = path
+        self.options = options
+        self.columns = []
+        self.rows_count = 0
+        self._file = None
+
+    def open(self, columns: List[str]) -> 'RowWriter':
+        self.columns = columns
+        return self
+
+    @abstractmethod
+    def write_rows(self, rows: Iterable[list]) -> None:
+        pass
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'RowWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+class CsvRowWriter(RowWriter):
+    def open(self, columns: List[str]) -> 'RowWriter':
+        super().open(columns)
+        self._file = open(self.path, 'w', encoding='utf-16', newline='')
+        self._writer = csv.writer(
+            self._file,
+            delimiter=self.options.get('delimiter', ';'),
+            lineterminator=os.linesep
+        )
+        self._writer.writerow(columns)
+        return self
+
+    def write_rows(self, rows: Iterable[list]) -> None:
+        for row in rows:
+            self._writer.writerow(row)
+            self.rows_count += 1
+        self._file.flush()
+
+
+class JsonLinesRowWriter(RowWriter):
+    def open(self, columns: List[str]) -> 'RowWriter':
+        super().open(columns)
+        self._file = open(self.path, 'w', encoding='utf-8')
+        return self
+
+    def write_rows(self, rows: Iterable[list]) -> None:
+        for row in rows:
+            self._file.write(json.dumps(dict(zip(self.columns, row)), ensure_ascii=False))
+            self._file.write('\n')
+            self.rows_count += 1
+        self._file.flush()
+
+
+class XlsxRowWriter(RowWriter):
+    _workbook = None
+
+    def open(self, columns: List[str]) -> 'RowWriter':
+        from openpyxl import Workbook
+
+        super().open(columns)
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet(self.options.get('sheet_name', 'Sheet1'))
+        self._sheet.append(columns)
+        return self
+
+    def write_rows(self, rows: Iterable[list]) -> None:
+        for row in rows:
+            self._sheet.append(row)
+            self.rows_count += 1
+
+    def close(self) -> None:
+        if self._workbook is not None:
+            self._workbook.save(self.path)
+            self._workbook = None
+
+
+class ArrowRowWriter(RowWriter):
+    _writer = None
+
+    def open(self, columns: List[str]) -> 'RowWriter':
+        try:
+            import pyarrow
+        except ImportError as e:
+            raise ImportError(f'Install "pyarrow" package to write {self.path!r}') from e
+
+        super().open(columns)
+        self._pyarrow = pyarrow
+        self._schema = pyarrow.schema([(column, pyarrow.string()) for column in columns])
+        self._batch_size = self.options.get('batch_size', 10000)
+        self._rows = []
+        self._writer = self._get_writer()
+        return self
+
+    def _get_writer(self):
+        return self._pyarrow.ipc.new_file(self.path, self._schema)
+
+    def write_rows(self, rows: Iterable[list]) -> None:
+        for row in rows:
+            self._rows.append(row)
+            self.rows_count += 1
+            if len(self._rows) >= self._batch_size:
+                self._flush()
+
+    def _flush(self) -> None:
+        if not self._rows:
+            return
+        arrays = [
+            self._pyarrow.array([None if value is None else str(value) for value in values], self._pyarrow.string())
+            for values in zip(*self._rows)
+        ]
+        self._writer.write_batch(self._pyarrow.RecordBatch.from_arrays(arrays, schema=self._schema))
+        self._rows = []
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._flush()
+            self._writer.close()
+            self._writer = None
+
+
+class ParquetRowWriter(ArrowRowWriter):
+    def _get_writer(self):
+        import pyarrow.parquet
+
+        return pyarrow.parquet.ParquetWriter(self.path, self._schema)
+
+
+ROW_WRITERS: Dict[str, Type[RowWriter]] = {
+    'csv': CsvRowWriter,
+    'jsonl': JsonLinesRowWriter,
+    'xlsx': XlsxRowWriter,
+    'parquet': ParquetRowWriter,
+    'arrow': ArrowRowWriter,
+    'feather': ArrowRowWriter,
+}
+
+
+def get_row_writer(file_format: str, path: str, **options) -> RowWriter:
+    if file_format not in ROW_WRITERS:
+        raise ValueError(f'Format {file_format!r} is not supported for streaming, use one of: {", ".join(ROW_WRITERS)}')
+    return ROW_WRITERS[file_format](path, **options)
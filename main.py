@@ -1,46 +1,111 @@
+import argparse
 import json
-import os.path
+import math
 import sys
+import threading
 import time
 import unicodedata
-from typing import Set, Dict, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Callable, Set, Dict, Iterable, Iterator, List, NamedTuple, TextIO, Tuple, Union
 from urllib.parse import urlparse
 
-from pandas import DataFrame
-from tqdm import tqdm
 from vk import API
 from vk.exceptions import VkAPIError
-from requests.exceptions import ConnectionError
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
 
-from configs import CONFIG
-from configs import get_logger
-from finder import Public, PosWidget
-from helpers import split_dict_by_keys
+from configs import CONFIG, save_config_snapshot
+from configs import get_logger, setup_logging, summarize
+from finder import Public, PosWidget, PublicsCache, ChecksState, RunJournal, IdsResolver, PublicsArchive
+from finder import ChecksDaemon, PosUrlsStore, process_publics_offline
+from helpers import split_dict_by_keys, split_list, get_row_writer, ROW_WRITERS, TokenBucket, RunMetrics
+from helpers import Backoff, CircuitBreaker, CircuitOpenError, Progress, parse_identify
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
 
 logger = get_logger(__name__)
 
 
+class VkClient(NamedTuple):
+    api: API
+    rate_limiter: TokenBucket
+
+
+PublicsFetch = Callable[[Dict[str, Public]], Iterator[Tuple[List[Union[dict, Public]], Union[Dict[int, dict], None]]]]
+
+
 class WidgetFinder:
     VK_BASE_URL = 'https://vk.com'
+    VK_RETRY_ERROR_CODES = (6, 9, 10)
+    VK_PAYLOAD_ERROR_CODES = (13, 100)
+    VK_FATAL_ERROR_CODES = (5, 14, 17, 29)
+    REQUIRED_FIELDS = ('menu',)
 
     urls: Set[str]
     publics: Dict[str, Public]
-    __api: API
+    __clients: List[VkClient]
+    __backoff: Backoff
+    __circuit_breaker: CircuitBreaker
+    __cache: Union[PublicsCache, None]
+    __state: Union[ChecksState, None]
+    __journal: Union[RunJournal, None]
+    __resolver: Union[IdsResolver, None]
+    __archive: Union[PublicsArchive, None]
+    __pos_urls_store: Union[PosUrlsStore, None]
+    __index: Dict[Union[int, str], Public]
+    __aliases: Dict[Public, List[Public]]
+    __handled: Set[Public]
+    __group_ids: Dict[str, int]
+    __metrics: RunMetrics
     file_format: str
+    fields: List[str]
+    fail_fast: bool
 
     def __init__(self):
         self.urls = set()
         self.publics = {}
         self.__counters = {result_type.name: 0 for result_type in PosWidget.ResultType}
-        self.__api = API(access_token=CONFIG.vk_api['access_token'], v=CONFIG.vk_api.get('version', 5.221))
+        self.fields = self.get_request_fields()
+        self.__clients = [self.create_client(access_token) for access_token in CONFIG.vk_api.access_tokens]
+        self.__next_client = 0
+        self.__clients_lock = threading.Lock()
+        self.__local = threading.local()
+        self.__backoff = Backoff(
+            base=CONFIG.exceptions.connection.get('timeout', 5),
+            max_delay=CONFIG.exceptions.connection.get('max_timeout', 60),
+            jitter=CONFIG.exceptions.connection.get('jitter', True)
+        )
+        self.__circuit_breaker = CircuitBreaker(
+            failure_threshold=CONFIG.exceptions.circuit_breaker.get('failures', 10),
+            reset_timeout=CONFIG.exceptions.circuit_breaker.get('reset_timeout', 30)
+        )
+        self.__cache = PublicsCache(
+            path=CONFIG.paths.cache_file,
+            ttl=CONFIG.cache.ttl,
+            fields=self.fields
+        ) if CONFIG.cache.enabled else None
+        self.__state = ChecksState(path=CONFIG.paths.state_file) if CONFIG.parsing.incremental else None
+        self.__journal = None
+        self.__resolver = IdsResolver(path=CONFIG.paths.ids_file) if CONFIG.parsing.resolve_ids else None
+        self.__archive = PublicsArchive(path=CONFIG.paths.archive_file) if CONFIG.parsing.save_public_data else None
+        self.__pos_urls_store = PosUrlsStore(path=CONFIG.paths.pos_urls_file) \
+            if CONFIG.pos_urls_cache.persist and PosWidget.POS_URLS_CACHE is not None else None
+        if self.__pos_urls_store:
+            self.__pos_urls_store.load(PosWidget.POS_URLS_CACHE)
+        self.__index = {}
+        self.__aliases = {}
+        self.__handled = set()
+        self.__group_ids = {}
+        self.__metrics = RunMetrics()
+        self.fail_fast = False
         self.file_format = self.get_file_format()
 
     def get_file_format(self) -> str:
         try:
             file_format = CONFIG.paths.result_file.split('.')[-1]
             logger.info(f'Selected export format {file_format!r}')
-            if file_format not in ['csv', 'xlsx', 'json', 'html', 'md']:
+            if file_format not in ['csv', 'xlsx', 'json', 'jsonl', 'html', 'md', 'parquet', 'arrow', 'feather']:
                 raise ValueError(f'Unsupported format for file {CONFIG.paths.result_file!r}')
         except IndexError:
             file_format = 'xlsx'
@@ -48,15 +113,87 @@ class WidgetFinder:
 
         return file_format
 
+    @classmethod
+    def get_request_fields(cls) -> List[str]:
+        fields = list(CONFIG.parsing.public_data_fields)
+        if CONFIG.parsing.minimal_fields and not CONFIG.parsing.save_public_data:
+            display_fields = {field.split('.')[0] for field in CONFIG.display.public_display_fields}
+            fields = [field for field in fields if field in display_fields or field in cls.REQUIRED_FIELDS]
+        fields.extend(field for field in cls.REQUIRED_FIELDS if field not in fields)
+        return fields
+
+    @classmethod
+    def get_stored_fields(cls) -> Set[str]:
+        return {'id', 'screen_name', *(field.split('.')[0] for field in CONFIG.display.public_display_fields)}
+
     @property
     def api(self):
-        return self.__api
+        return self.__clients[0].api
+
+    @property
+    def apis(self) -> List[API]:
+        return [client.api for client in self.__clients]
+
+    def create_client(self, access_token: str) -> VkClient:
+        api = API(access_token=access_token, v=CONFIG.vk_api.version)
+        session = api._api.session
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=CONFIG.vk_api.workers)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers['Accept-Encoding'] = 'gzip, deflate'
+        session.hooks['response'].append(self.__on_response)
+        return VkClient(api=api, rate_limiter=TokenBucket(rate=CONFIG.vk_api.requests_per_second))
+
+    def __init_worker(self) -> None:
+        with self.__clients_lock:
+            self.__local.client = self.__clients[self.__next_client % len(self.__clients)]
+            self.__next_client += 1
+
+    def __get_client(self) -> VkClient:
+        return getattr(self.__local, 'client', self.__clients[0])
+
+    @property
+    def metrics(self) -> RunMetrics:
+        return self.__metrics
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        return dict(self.__counters)
 
-    def start(self) -> None:
-        self.clear_resources()
-        self.read_urls_from_file()
-        self.process_publics()
-        self.save_results()
+    def reset_counters(self) -> None:
+        self.__counters = dict.fromkeys(self.__counters, 0)
+
+    def start(self, resume: bool = False, offline: bool = False, processes: int = None) -> None:
+        if not resume:
+            self.clear_resources()
+        if CONFIG.parsing.journal:
+            self.__journal = RunJournal(path=CONFIG.paths.journal_file, fields=self.get_stored_fields())
+            self.__journal.open(resume=resume)
+        logger.info(f'Request fields of publics: {",".join(self.fields)}')
+
+        try:
+            if CONFIG.streaming.enabled and not offline:
+                self.process_stream()
+                return
+            with self.__metrics.timer('read'):
+                self.read_urls_from_file()
+            if offline:
+                process_publics_offline(self, processes)
+            else:
+                self.process_publics()
+            self.save_results()
+        finally:
+            self.close()
+            self.save_report()
+
+    def close(self) -> None:
+        if self.__journal:
+            self.__journal.close()
+            self.__journal = None
+        if self.__archive:
+            with self.__metrics.timer('archive'):
+                self.__archive.close()
+        self.save_pos_urls()
 
     def clear_resources(self) -> None:
         logger.info(f'Clearing resources ...')
@@ -66,131 +203,523 @@ class WidgetFinder:
     def read_urls_from_file(self) -> None:
         logger.info('Reading file ...')
         print('Reading file ...')
+        with self.open_target_file() as file:
+            self.urls = set(self.iter_target_urls(file))
+        logger.info(f'Number of links found: {len(self.urls)}')
+        print(f'Number of links found: {len(self.urls)}')
+
+        logger.info('Prepare publics from links ...')
+        print('Prepare publics from links ...')
+        for url in self.urls:
+            if url not in self.publics:
+                self.publics[url] = Public(url)
+
+    def iter_urls_from_file(self, chunk_size: int) -> Iterator[List[str]]:
+        logger.info('Reading file by chunks ...')
+        print('Reading file by chunks ...')
+        return self.__iter_urls_chunks(self.open_target_file(), chunk_size)
+
+    def __iter_urls_chunks(self, file: TextIO, chunk_size: int) -> Iterator[List[str]]:
+        urls_count = 0
+        with file:
+            urls = {}
+            for url in self.iter_target_urls(file):
+                urls[url] = None
+                if len(urls) == chunk_size:
+                    urls_count += len(urls)
+                    yield list(urls)
+                    urls = {}
+            if urls:
+                urls_count += len(urls)
+                yield list(urls)
+        logger.info(f'Number of links found: {urls_count}')
+
+    def open_target_file(self, exit_on_error: bool = True) -> Union[TextIO, None]:
         try:
-            with open(CONFIG.paths.target_file, 'r', encoding='utf-8') as file:
-                self.urls = self.clean_urls(file.read().splitlines())
-                if not self.urls:
-                    logger.error(f'No links found in file {CONFIG.paths.target_file!r}.')
-                    print(f'No links found in file {CONFIG.paths.target_file!r}.')
-                    exit(1)
-                else:
-                    logger.info('Prepare publics from links ...')
-                    print('Prepare publics from links ...')
-                    for url in self.urls:
-                        if url not in self.publics:
-                            self.publics[url] = Public(url)
+            file = open(CONFIG.paths.target_file, 'r', encoding='utf-8')
         except FileNotFoundError:
-            open(CONFIG.paths.target_file, 'w', encoding='utf-8').close()
             logger.error(f'File with links not found: {CONFIG.paths.target_file!r}')
+            if not exit_on_error:
+                return None
+            open(CONFIG.paths.target_file, 'w', encoding='utf-8').close()
             print(f'File with links not found: {CONFIG.paths.target_file!r}')
             exit(2)
-        finally:
-            logger.info(f'Number of links found: {len(self.urls)}')
-            print(f'Number of links found: {len(self.urls)}')
+
+        if any(line.strip() for line in file):
+            file.seek(0)
+            return file
+
+        file.close()
+        logger.error(f'No links found in file {CONFIG.paths.target_file!r}.')
+        if not exit_on_error:
+            return None
+        print(f'No links found in file {CONFIG.paths.target_file!r}.')
+        exit(1)
+
+    @classmethod
+    def iter_target_urls(cls, file: TextIO) -> Iterator[str]:
+        for line in file:
+            if line.strip():
+                yield cls.clean_url(line)
+
+    def read_target_urls(self) -> Union[Set[str], None]:
+        file = self.open_target_file(exit_on_error=False)
+        if file is None:
+            return None
+        with file:
+            return set(self.iter_target_urls(file))
 
     def process_publics(self) -> None:
         logger.info('Start processing:')
         print('Start processing:')
 
-        publics_group = split_dict_by_keys(self.publics)
-
-        with tqdm(
-                total=len(self.urls),
-                ncols=150,
-                desc='Processing',
-                unit='url',
-                mininterval=CONFIG.progressbar.min_interval_per_unit,
-        ) as pbar:
-            pbar.set_postfix(self.__counters)
-            for publics in publics_group:
-                publics_data_list = publics.values()
-                try:
-                    publics_data_list = self.__get_publics_data(
-                        group_identifies=[p.identify for p in publics_data_list]
-                    )
-                    pbar.set_postfix(self.__counters)
-                except VkAPIError as ve:
-                    sys.exit(f'{type(ve).__name__}: {ve}')
-                except ConnectionError as ce:
-                    for p in publics_data_list:
-                        p.pos_widget.result = PosWidget.ResultType.TIMEOUT
-                    logger.error(f'Raised exception during handle {str(publics.keys())}:\n{type(ce)} {ce}')
-                except RuntimeError as e:
-                    for p in publics_data_list:
-                        p.pos_widget.result = PosWidget.ResultType.ERROR
-                    logger.error(f'Raised exception during handle {str(publics.keys())}:\n{type(e)} {e}')
-                finally:
-                    for public_data in publics_data_list:
-                        if isinstance(public_data, dict):
-                            public = self.get_public(public_data)
-                            if public:
-                                public.parse(public_data)
-                            else:
-                                public = Public(f'https://vk.com/{public_data.get("screen_name")}')
-                                public.pos_widget.result = PosWidget.ResultType.ERROR
-                        else:
-                            public: Public = public_data
+        self.check_publics(self.publics, progress=True)
+        logger.info(f'Processing complete! {self.__counters}')
 
-                        self.__increment_counter(public.pos_widget.result)
+    def check_publics(self, publics: Dict[str, Public], fetch: PublicsFetch = None, progress: bool = False) -> None:
+        with self.__progressbar(total=len(publics), disable=not progress) as pbar:
+            self.__process_publics(publics, pbar, fetch)
 
-                        pbar.set_postfix(self.__counters)
-                        pbar.update(1)
+    @classmethod
+    def get_requests_count(cls, publics_count: int) -> int:
+        return max(math.ceil(math.ceil(publics_count / 500) / CONFIG.vk_api.execute_batch_size), 1)
 
-                        sleep = CONFIG.progressbar.min_interval_per_unit
-                        if sleep and sleep > 0:
-                            time.sleep(sleep)
+    def check_urls(self, urls: List[str]) -> Dict[str, dict]:
+        self.urls = set(urls)
+        self.publics = {url: Public(url) for url in urls}
+        self.check_publics(self.publics)
+        return {url: self.get_answer(public) for url, public in self.publics.items()}
+
+    @classmethod
+    def get_answer(cls, public: Public) -> dict:
+        pos_widget = public.pos_widget
+        return dict(
+            url=public.url,
+            result=pos_widget.result.name,
+            result_text=str(pos_widget.result),
+            public={
+                field: public.get_field_data(field)
+                for field in CONFIG.display.public_display_fields
+                if field not in ('pos_result', 'url', 'pos_links')
+            },
+            pos_urls=[
+                dict(
+                    url=pos_url.url,
+                    status=pos_url.status_type.name,
+                    status_text=str(pos_url.status_type),
+                    utm_codes=[str(code) for code in pos_url.utm_codes.values()]
+                )
+                for pos_url in pos_widget.urls
+            ]
+        )
+
+    def process_stream(self) -> None:
+        logger.info('Start stream processing:')
+        print('Start stream processing:')
+
+        max_links_per_widget = CONFIG.streaming.pos_links
+        writer = get_row_writer(self.file_format, CONFIG.paths.result_file, delimiter=CONFIG.display.csv_delimiter)
+        urls_chunks = self.__metrics.timed_iter('read', self.iter_urls_from_file(CONFIG.streaming.chunk_size))
+        with writer.open(self.get_columns(max_links_per_widget)), self.__progressbar() as pbar:
+            for urls in urls_chunks:
+                self.urls = set(urls)
+                self.publics = {url: Public(url) for url in urls}
+                self.__process_publics(self.publics, pbar)
+                with self.__metrics.timer('export', exclude='rows'):
+                    writer.write_rows(self.__metrics.timed_iter('rows', self.get_rows(max_links_per_widget)))
+            self.urls = set()
+            self.publics = {}
 
         logger.info(f'Processing complete! {self.__counters}')
+        print(f'Processing complete! See results in {CONFIG.paths.result_file!r}')
 
-    def __get_publics_data(
+    def __progressbar(self, total: int = None, disable: bool = False) -> Progress:
+        pbar = Progress(
+            total=total,
+            mode='quiet' if disable else CONFIG.progressbar.mode,
+            refresh_interval=CONFIG.progressbar.refresh_interval,
+            log_interval=CONFIG.progressbar.log_interval,
+        )
+        pbar.update(0, self.__counters)
+        return pbar
+
+    def __process_publics(self, publics: Dict[str, Public], pbar: Progress, fetch: PublicsFetch = None) -> None:
+        publics = self.__restore_publics(publics, pbar)
+        publics = self.index_publics(publics)
+        publics = {self.get_request_identify(p): p for p in publics.values()}
+        for publics_data_list, checks in (fetch or self.__fetch_from_api)(publics):
+            self.__handle_publics_data(publics_data_list, pbar, checks)
+
+    def __fetch_from_api(
             self,
-            group_identifies: List[str],
-            tries: int = 0,
-            timeout: int = CONFIG.exceptions.connection.get('timeout', 5)
-    ) -> List[dict]:
-        group_ids = ','.join(group_identifies)
-        fields = CONFIG.parsing.public_data_fields
+            publics: Dict[str, Public]
+    ) -> Iterator[Tuple[List[Union[dict, Public]], Union[Dict[int, dict], None]]]:
+        cached_data = {}
+        if self.__cache:
+            cached_data = self.__cache.get_many(publics)
+            publics = {identify: p for identify, p in publics.items() if identify not in cached_data}
+
+        publics_group = split_dict_by_keys(publics)
+        publics_packs = split_list(publics_group, CONFIG.vk_api.execute_batch_size)
+
+        with ThreadPoolExecutor(
+                max_workers=CONFIG.vk_api.workers * len(self.__clients),
+                thread_name_prefix='fetcher',
+                initializer=self.__init_worker
+        ) as executor:
+            futures = [executor.submit(self.__fetch_publics_pack, publics_pack) for publics_pack in publics_packs]
+            yield list(cached_data.values()), None
+
+            api_error = None
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                try:
+                    publics_data_list = future.result()
+                except VkAPIError as ve:
+                    if not api_error:
+                        api_error = ve
+                        for f in futures:
+                            f.cancel()
+                    continue
 
+                if self.__cache:
+                    self.__cache.put_many(d for d in publics_data_list if isinstance(d, dict))
+                yield publics_data_list, None
+
+            if api_error:
+                sys.exit(f'{type(api_error).__name__}: {api_error}')
+
+    def __handle_publics_data(
+            self,
+            publics_data_list: List[Union[dict, Public]],
+            pbar: Progress,
+            checks: Dict[int, dict] = None
+    ) -> None:
+        previous_checks = checks or {}
+        checks = []
+        processed = []
+        resolved = []
+        handled = 0
+        skipped = 0
+        parse_seconds = 0.
+        if self.__archive and not previous_checks:
+            self.__archive.put_many(d for d in publics_data_list if isinstance(d, dict))
+        if self.__state and not previous_checks:
+            previous_checks = self.__state.get_many(d for d in publics_data_list if isinstance(d, dict))
+
+        for public_data in publics_data_list:
+            started = time.perf_counter()
+            if isinstance(public_data, dict):
+                public = self.get_public(public_data)
+                if public in self.__handled:
+                    public = self.__index.get(public_data.get('screen_name', '').lower())
+                    if not public or public in self.__handled:
+                        skipped += 1
+                        continue
+                if public:
+                    self.__merge_aliases(public, public_data)
+                if public and self.__resolver:
+                    for p in (public, *self.__aliases.get(public, ())):
+                        key = self.get_index_key(p.identify)
+                        if isinstance(key, str) and self.__group_ids.get(key) != public_data['id']:
+                            resolved.append((key, public_data['id']))
+                if public and public_data['id'] in previous_checks:
+                    public.restore(public_data, previous_checks[public_data['id']])
+                    processed.append(public)
+                elif public:
+                    public.parse(public_data)
+                    processed.append(public)
+                    if self.__state:
+                        checks.append((public_data, public.pos_widget.to_dict()))
+                else:
+                    public = Public(f'https://vk.com/{public_data.get("screen_name")}')
+                    public.pos_widget.result = PosWidget.ResultType.ERROR
+            else:
+                public: Public = public_data
+                if public in self.__handled:
+                    skipped += 1
+                    continue
+            self.__handled.add(public)
+            aliases = self.__share_result(public)
+            if aliases and processed and processed[-1] is public:
+                processed.extend(aliases)
+            parse_seconds += time.perf_counter() - started
+
+            self.__increment_counter(public.pos_widget.result, len(aliases) + 1)
+            handled += len(aliases) + 1
+
+        pbar.update(handled, self.__counters)
+        self.__metrics.add_time('parse', parse_seconds)
+        self.__metrics.increment('publics_handled', len(publics_data_list) - skipped)
+        if checks:
+            self.__state.put_many(checks)
+        if resolved:
+            self.__resolver.put_many(resolved)
+        if self.__journal and processed:
+            self.__journal.write_many(processed)
+
+    def __merge_aliases(self, public: Public, public_data: dict) -> None:
+        other = self.__index.get(public_data.get('screen_name', '').lower())
+        if not other or other is public or other in self.__handled:
+            return
+
+        self.__aliases.setdefault(public, []).extend([other, *self.__aliases.pop(other, [])])
+        self.__handled.add(other)
+        self.__metrics.increment('aliases', 1)
+
+    def __share_result(self, public: Public) -> List[Public]:
+        aliases = self.__aliases.get(public, [])
+        for alias in aliases:
+            alias.is_government_org = public.is_government_org
+            alias.pos_widget = public.pos_widget
+            alias.data = public.data
+        return aliases
+
+    def __restore_publics(self, publics: Dict[str, Public], pbar: Progress) -> Dict[str, Public]:
+        entries = self.__journal.entries if self.__journal else {}
+        if not entries:
+            return publics
+
+        not_processed = {}
+        for url, public in publics.items():
+            entry = entries.get(url)
+            if entry:
+                public.restore(entry['data'], entry['pos_widget'])
+                self.__increment_counter(public.pos_widget.result)
+            else:
+                not_processed[url] = public
+        pbar.update(len(publics) - len(not_processed), self.__counters)
+        return not_processed
+
+    def __fetch_publics(self, publics: Dict[str, Public]) -> List[Union[dict, Public]]:
+        publics_data_list = list(publics.values())
         try:
-            logger.debug(f'Get data for publics: {group_ids}')
-            publics_data = self.api.groups.getById(
-                group_ids=group_ids,
-                fields=','.join(fields)
-            )
-        except ConnectionError as ce:
-            if tries == CONFIG.exceptions.connection.get('max_tries', 5):
-                raise ce
-
-            tries += 1
-            timeout = timeout * tries
-
-            logger.error(f'{type(ce)}: Can\'t get public data, timeout {timeout} sec: '
-                         f'tries={tries}, group_identifies={str(group_identifies)}')
-            print(f'\n{type(ce).__name__}: Can\'t get public data, timeout {timeout} sec: : '
-                  f'tries={tries}, urls={len(group_identifies)}. '
-                  f'For more detail see {CONFIG.paths.result_file!r}.')
-
-            time.sleep(timeout)
-            return self.__get_publics_data(group_identifies, tries)
+            return self.__get_publics_data(group_identifies=[self.get_request_identify(p) for p in publics_data_list])
+        except VkAPIError as ve:
+            if ve.code in self.VK_FATAL_ERROR_CODES:
+                raise ve
+            if ve.code in self.VK_PAYLOAD_ERROR_CODES and len(publics) > 1:
+                return self.__bisect_publics(publics, ve)
+            result_type = PosWidget.ResultType.TIMEOUT if ve.code in self.VK_RETRY_ERROR_CODES \
+                else PosWidget.ResultType.ERROR
+            return self.__fail_publics(publics, result_type, ve)
+        except (CircuitOpenError, RequestException) as e:
+            return self.__fail_publics(publics, PosWidget.ResultType.TIMEOUT, e)
+        except RuntimeError as e:
+            return self.__fail_publics(publics, PosWidget.ResultType.ERROR, e)
+
+    def __bisect_publics(self, publics: Dict[str, Public], error: VkAPIError) -> List[Union[dict, Public]]:
+        logger.warning(f'Split failed batch of {len(publics)} publics in half: {type(error)} {error}')
+        self.__metrics.increment('bisections')
+        keys = list(publics)
+        middle = len(keys) // 2
+        return self.__fetch_publics({key: publics[key] for key in keys[:middle]}) + \
+            self.__fetch_publics({key: publics[key] for key in keys[middle:]})
+
+    @staticmethod
+    def __fail_publics(
+            publics: Dict[str, Public],
+            result_type: PosWidget.ResultType,
+            error: Exception
+    ) -> List[Public]:
+        for p in publics.values():
+            p.pos_widget.result = result_type
+        logger.error('Raised exception during handle %d publics %s:\n%s %s',
+                     len(publics), summarize(publics), type(error), error)
+        return list(publics.values())
+
+    def __fetch_publics_pack(self, publics_pack: List[Dict[str, Public]]) -> List[Union[dict, Public]]:
+        if len(publics_pack) == 1:
+            return self.__fetch_publics(publics_pack[0])
+
+        group_identifies_list = [[self.get_request_identify(p) for p in publics.values()] for publics in publics_pack]
+        code = self.build_execute_code(group_identifies_list, self.fields)
+        if len(code) > CONFIG.vk_api.execute_max_code_length:
+            logger.debug(f'Execute code is too large ({len(code)} chars), split {len(publics_pack)} batches')
+            middle = len(publics_pack) // 2
+            return self.__fetch_publics_pack(publics_pack[:middle]) + self.__fetch_publics_pack(publics_pack[middle:])
+
+        try:
+            publics_data_lists = self.__get_publics_data_bundle(code, group_identifies_list)
+        except VkAPIError as ve:
+            if ve.code in self.VK_FATAL_ERROR_CODES:
+                raise ve
+            if ve.code in self.VK_RETRY_ERROR_CODES:
+                return self.__fail_publics(self.__merge_publics_pack(publics_pack), PosWidget.ResultType.TIMEOUT, ve)
+            logger.warning(f'Execute failed, fallback to plain calls for {len(publics_pack)} batches: {ve}')
+            publics_data_lists = [None] * len(publics_pack)
+        except (CircuitOpenError, RequestException) as e:
+            return self.__fail_publics(self.__merge_publics_pack(publics_pack), PosWidget.ResultType.TIMEOUT, e)
+        except RuntimeError as e:
+            logger.warning(f'Execute failed, fallback to plain calls for {len(publics_pack)} batches: '
+                           f'{type(e)} {e}')
+            publics_data_lists = [None] * len(publics_pack)
+
+        result = []
+        for publics, publics_data_list in zip(publics_pack, publics_data_lists):
+            if publics_data_list is None:
+                result.extend(self.__fetch_publics(publics))
+            else:
+                result.extend(publics_data_list)
+        return result
+
+    @staticmethod
+    def __merge_publics_pack(publics_pack: List[Dict[str, Public]]) -> Dict[str, Public]:
+        return {url: public for publics in publics_pack for url, public in publics.items()}
+
+    def __get_publics_data(self, group_identifies: List[str]) -> List[dict]:
+        group_ids = ','.join(group_identifies)
+        logger.debug('Get data for %d publics: %s', len(group_identifies), summarize(group_identifies))
+        publics_data = self.__call_api(
+            'groups.getById',
+            group_identifies,
+            group_ids=group_ids,
+            fields=','.join(self.fields)
+        )
         return publics_data['groups']
 
+    def __get_publics_data_bundle(self, code: str, group_identifies_list: List[List[str]]) -> List[List[dict]]:
+        logger.debug(f'Get data for {len(group_identifies_list)} batches of publics with execute')
+        group_identifies = [identify for group_identifies in group_identifies_list for identify in group_identifies]
+        response = self.__call_api('execute', group_identifies, code=code)
+        if not isinstance(response, list) or len(response) != len(group_identifies_list):
+            raise RuntimeError(f'Unexpected execute response for {len(group_identifies_list)} batches')
+
+        return [
+            publics_data['groups'] if isinstance(publics_data, dict) else None
+            for publics_data in response
+        ]
+
+    def __call_api(self, method: str, group_identifies: List[str], **params):
+        tries = 0
+        max_tries = CONFIG.exceptions.connection.get('max_tries', 5)
+        while True:
+            try:
+                if self.__circuit_breaker.is_open:
+                    with self.__metrics.timer('circuit_wait'):
+                        self.__circuit_breaker.check(wait=not self.fail_fast)
+                client = self.__get_client()
+                with self.__metrics.timer('wait'):
+                    client.rate_limiter.acquire()
+                response = self.__send_api_request(client.api, method, **params)
+                self.__circuit_breaker.record_success()
+                return response
+            except (RequestException, VkAPIError) as e:
+                if isinstance(e, VkAPIError) and e.code not in self.VK_RETRY_ERROR_CODES:
+                    self.__circuit_breaker.record_success()
+                    raise e
+                if self.__circuit_breaker.record_failure():
+                    self.__metrics.increment('circuit_opened')
+                    logger.error(f'Too many failed requests to VK API, pause requests for '
+                                 f'{self.__circuit_breaker.reset_timeout} sec')
+                if tries == max_tries or (self.fail_fast and self.__circuit_breaker.is_open):
+                    raise e
+
+                tries += 1
+                self.__metrics.increment('retries')
+                if self.__circuit_breaker.is_open:
+                    logger.warning('%s: Can\'t get public data, wait for the circuit to close: tries=%d, '
+                                   'group_identifies=%s', type(e), tries, summarize(group_identifies))
+                    continue
+
+                timeout = self.__backoff.get_delay(tries)
+
+                logger.error('%s: Can\'t get public data, timeout %.1f sec: tries=%d, group_identifies=%s',
+                             type(e), timeout, tries, summarize(group_identifies))
+                print(f'\n{type(e).__name__}: Can\'t get public data, timeout {timeout:.1f} sec: : '
+                      f'tries={tries}, urls={len(group_identifies)}. '
+                      f'For more detail see {CONFIG.paths.log_file!r}.')
+
+                time.sleep(timeout)
+            except BaseException:
+                self.__circuit_breaker.release()
+                raise
+
+    def __send_api_request(self, api: API, method: str, **params):
+        started = time.perf_counter()
+        self.__metrics.increment('requests')
+        try:
+            return api(method)(**params)
+        except VkAPIError:
+            self.__metrics.increment('api_errors')
+            raise
+        except RequestException:
+            self.__metrics.increment('connection_errors')
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.__metrics.add_time('fetch', elapsed)
+            self.__metrics.observe('batch_seconds', elapsed)
+
+    @classmethod
+    def build_execute_code(cls, group_identifies_list: List[List[str]], fields: List[str]) -> str:
+        fields = ','.join(fields)
+        calls = ','.join(
+            f'API.groups.getById({json.dumps(dict(group_ids=",".join(group_identifies), fields=fields))})'
+            for group_identifies in group_identifies_list
+        )
+        return f'return [{calls}];'
+
+    def __on_response(self, response, *args, **kwargs) -> None:
+        self.__metrics.increment('bytes_received', len(response.content))
+        self.__metrics.increment(
+            'bytes_transferred', int(response.headers.get('Content-Length', len(response.content)))
+        )
+
+    @classmethod
+    def get_index_key(cls, identify: str) -> Union[int, str]:
+        key = parse_identify(identify)
+        return key if isinstance(key, int) else key.lower()
+
+    def index_publics(self, publics: Dict[str, Public]) -> Dict[str, Public]:
+        keys = {url: self.get_index_key(public.identify) for url, public in publics.items()}
+        screen_names = [key for key in keys.values() if isinstance(key, str)]
+        self.__group_ids = self.__resolver.get_many(screen_names) if self.__resolver else {}
+
+        self.__index = {}
+        self.__aliases = {}
+        self.__handled = set()
+        targets = {}
+        for url, public in publics.items():
+            key = keys[url]
+            target = self.__index.setdefault(self.__group_ids.get(key, key), public)
+            if isinstance(key, str):
+                self.__index.setdefault(key, target)
+            if target is public:
+                targets[url] = public
+            else:
+                self.__aliases.setdefault(target, []).append(public)
+
+        aliases_count = len(publics) - len(targets)
+        if aliases_count:
+            logger.info(f'Found {aliases_count} urls of already listed publics, they will not be requested again')
+            self.__metrics.increment('aliases', aliases_count)
+        return targets
+
+    def get_request_identify(self, public: Public) -> str:
+        group_id = self.__group_ids.get(self.get_index_key(public.identify))
+        return f'club{group_id}' if group_id else public.identify
+
     def get_public(self, public_data: dict) -> Public:
-        by_club = self.publics.get(f'{self.VK_BASE_URL}/club{public_data["id"]}')
-        by_public = self.publics.get(f'{self.VK_BASE_URL}/public{public_data["id"]}')
-        by_screen_name = self.publics.get(f'{self.VK_BASE_URL}/{public_data.get("screen_name", "")}')
-        return by_club if by_club else (by_public if by_public else by_screen_name)
+        public = self.__index.get(public_data['id'])
+        if not public:
+            public = self.__index.get(public_data.get('screen_name', '').lower())
+        return public
 
-    def __increment_counter(self, counter_type: PosWidget.ResultType) -> None:
-        self.__counters[counter_type.name] += 1
+    def __increment_counter(self, counter_type: PosWidget.ResultType, count: int = 1) -> None:
+        self.__counters[counter_type.name] += count
 
-    def save_results(self) -> None:
+    def get_max_links_per_widget(self, publics: Iterable[Public] = None) -> int:
         max_links_per_widget = 0
-        for public in self.publics.values():
+        for public in self.publics.values() if publics is None else publics:
             pos_widget = public.pos_widget
             if pos_widget and len(pos_widget.urls) > max_links_per_widget:
                 max_links_per_widget = len(pos_widget.urls)
+        return max_links_per_widget
 
-        data = []
+    @classmethod
+    def get_columns(cls, max_links_per_widget: int) -> List[str]:
         columns = []
         for field in CONFIG.display.public_display_fields:
             if field == 'pos_links':
@@ -200,56 +729,97 @@ class WidgetFinder:
                                     f'url_utm_codes-{i + 1}'])
             else:
                 columns.append(field)
+        return columns
 
-        for public in self.publics.values():
-            pos_widget = public.pos_widget
-            if CONFIG.parsing.skip_correct and pos_widget.result is PosWidget.ResultType.CORRECT:
-                continue
+    @classmethod
+    def get_row(cls, public: Public, max_links_per_widget: int) -> list:
+        pos_widget = public.pos_widget
+        row = []
+        for field in CONFIG.display.public_display_fields:
+            if field == 'pos_links':
+                if pos_widget:
+                    for i in range(max_links_per_widget):
+                        if i < len(pos_widget.urls):
+                            pos_link = pos_widget.urls[i]
+                            row.extend([
+                                pos_link.url,
+                                str(pos_link.status_type),
+                                '\n'.join([str(code) for code in pos_link.utm_codes.values()])
+                            ])
+                        else:
+                            row.extend([''] * 3)
+            elif field == 'pos_result':
+                row.append(str(pos_widget.result))
+            elif field == 'url':
+                row.append(public.url)
+            else:
+                row.append(str(public.get_field_data(field)))
+        return row
 
-            if CONFIG.parsing.save_public_data:
-                with open(
-                        os.path.join(CONFIG.paths.save_public_data_dir, f'{public.identify}.json'),
-                        encoding='utf8',
-                        mode='w'
-                ) as f:
-                    json.dump(public.data, f, ensure_ascii=False, indent=4)
-
-            row = []
-            for field in CONFIG.display.public_display_fields:
-                if field == 'pos_links':
-                    if pos_widget:
-                        for i in range(max_links_per_widget):
-                            if i < len(pos_widget.urls):
-                                pos_link = pos_widget.urls[i]
-                                row.extend([
-                                    pos_link.url,
-                                    str(pos_link.status_type),
-                                    '\n'.join([str(code) for code in pos_link.utm_codes.values()])
-                                ])
-                            else:
-                                row.extend([''] * 3)
-                elif field == 'pos_result':
-                    row.append(str(pos_widget.result))
-                elif field == 'url':
-                    row.append(public.url)
-                else:
-                    row.append(str(public.get_field_data(field)))
+    def get_rows(self, max_links_per_widget: int, publics: Iterable[Public] = None) -> Iterator[list]:
+        for public in self.publics.values() if publics is None else publics:
+            if CONFIG.parsing.skip_correct and public.pos_widget.result is PosWidget.ResultType.CORRECT:
+                continue
 
+            row = self.get_row(public, max_links_per_widget)
             if row:
-                data.append(row)
-
-        df = pd.DataFrame(data, columns=columns)
-        self.save_data(df)
-
-    def save_data(self, df: DataFrame):
+                yield row
+
+    def save_results(self, publics: List[Public] = None) -> None:
+        max_links_per_widget = self.get_max_links_per_widget(publics)
+        columns = self.get_columns(max_links_per_widget)
+        rows = self.__metrics.timed_iter('rows', self.get_rows(max_links_per_widget, publics))
+        with self.__metrics.timer('export', exclude='rows'):
+            if self.file_format in ROW_WRITERS:
+                writer = get_row_writer(
+                    self.file_format, CONFIG.paths.result_file, delimiter=CONFIG.display.csv_delimiter
+                )
+                with writer.open(columns):
+                    writer.write_rows(rows)
+                print(f'Processing complete! See results in {CONFIG.paths.result_file!r}')
+            else:
+                import pandas as pd
+
+                df = pd.DataFrame(list(rows), columns=columns)
+                self.save_data(df)
+
+    def save_report(self) -> None:
+        if not CONFIG.metrics.enabled:
+            return
+
+        for result_type, count in self.__counters.items():
+            self.__metrics.set_gauge(f'publics_{result_type.lower()}', count)
+        pos_urls_cache = PosWidget.POS_URLS_CACHE
+        if pos_urls_cache is not None:
+            self.__metrics.set_gauge('pos_urls_cache_hits', pos_urls_cache.hits)
+            self.__metrics.set_gauge('pos_urls_cache_misses', pos_urls_cache.misses)
+            self.__metrics.set_gauge('pos_urls_cached', pos_urls_cache.count())
+
+        self.__metrics.save_json(CONFIG.paths.report_file)
+        if CONFIG.metrics.prometheus:
+            self.__metrics.save_prometheus(CONFIG.paths.prometheus_file)
+        logger.info(f'Run report saved to {CONFIG.paths.report_file!r}')
+
+    def save_pos_urls(self) -> None:
+        if self.__pos_urls_store:
+            with self.__metrics.timer('pos_urls'):
+                self.__pos_urls_store.save(PosWidget.POS_URLS_CACHE)
+
+    def save_data(self, df: 'DataFrame'):
         if self.file_format == 'csv':
             df.to_csv(CONFIG.paths.result_file, sep=CONFIG.display.csv_delimiter, index=False, encoding='utf-16')
         if self.file_format == 'xlsx':
             df.to_excel(CONFIG.paths.result_file, index=False)
         if self.file_format == 'json':
             df.to_json(CONFIG.paths.result_file, orient='table', index=False, indent=4, force_ascii=False)
+        if self.file_format == 'jsonl':
+            df.to_json(CONFIG.paths.result_file, orient='records', lines=True, force_ascii=False)
         if self.file_format == 'html':
             df.to_html(CONFIG.paths.result_file, index=False, encoding='utf-16')
+        if self.file_format == 'parquet':
+            df.to_parquet(CONFIG.paths.result_file, index=False)
+        if self.file_format in ('arrow', 'feather'):
+            df.to_feather(CONFIG.paths.result_file)
         print(f'Processing complete! See results in {CONFIG.paths.result_file!r}')
 
     def clean_urls(self, urls: List[str]) -> Set[str]:
@@ -274,5 +844,45 @@ class WidgetFinder:
 
 
 if __name__ == '__main__':
+    save_config_snapshot()
+    parser = argparse.ArgumentParser(description='Find POS widgets on VK publics and check their urls')
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument('--resume', action='store_true',
+                       help='skip publics processed by the interrupted run, see paths.journal_file')
+    modes.add_argument('--offline', action='store_true',
+                       help='check publics saved in paths.archive_file again without VK API requests')
+    modes.add_argument('--daemon', action='store_true',
+                       help='keep re-checking publics of the target file by schedule, see the daemon config section')
+    modes.add_argument('--serve', action='store_true',
+                       help='run the local HTTP service validating publics by urls, see the service config section')
+    modes.add_argument('--show-public', nargs='+', metavar='IDENTIFY',
+                       help='print saved data of publics by ids or screen names from paths.archive_file and exit')
+    parser.add_argument('--processes', type=int,
+                        help='number of processes checking publics in --offline mode, all cores by default')
+    args = parser.parse_args()
+    if args.processes is not None and not args.offline:
+        parser.error('argument --processes: allowed only with --offline')
+    if args.processes is not None and args.processes < 1:
+        parser.error('argument --processes: must be a positive number')
+    setup_logging()
+
+    if args.show_public:
+        archive = PublicsArchive(path=CONFIG.paths.archive_file)
+        for identify in args.show_public:
+            public_data = archive.get(identify)
+            if public_data is None:
+                print(f'Public {identify!r} not found in {CONFIG.paths.archive_file!r}')
+            else:
+                print(json.dumps(public_data, ensure_ascii=False, indent=4))
+        archive.close()
+        sys.exit()
+
     widget_finder = WidgetFinder()
-    widget_finder.start()
+    if args.daemon:
+        ChecksDaemon(widget_finder).run()
+    elif args.serve:
+        from finder.service import run_service
+
+        run_service(widget_finder)
+    else:
+        widget_finder.start(resume=args.resume, offline=args.offline, processes=args.processes)
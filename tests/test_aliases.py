@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+
+from finder import IdsResolver
+from tests.vk_api import FakeVkApi, create_finder, get_group
+
+
+class AliasesTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.api = FakeVkApi([get_group(1, 'name1'), get_group(2, 'name2'), get_group(3, 'name3')])
+
+    def test_folds_id_urls_before_fetch(self):
+        urls = ['https://vk.com/club1', 'https://vk.com/public1', 'https://vk.com/club2']
+        with create_finder(self.api) as finder:
+            answers = finder.check_urls(urls)
+
+        self.assertEqual(sorted(identify for request in self.api.requests for identify in request), ['club1', 'club2'])
+        self.assertEqual(answers['https://vk.com/public1']['public']['id'], 1)
+        self.assertEqual(answers['https://vk.com/public1']['result'], answers['https://vk.com/club1']['result'])
+        self.assertEqual(finder.metrics.to_dict()['counters']['aliases'], 1)
+
+    def test_merges_screen_name_response_into_id_target(self):
+        urls = ['https://vk.com/club1', 'https://vk.com/name1', 'https://vk.com/name2']
+        with create_finder(self.api) as finder:
+            answers = finder.check_urls(urls)
+            publics = finder.publics
+
+        self.assertEqual(len(self.api.requests), 1)
+        self.assertIs(publics['https://vk.com/name1'].pos_widget, publics['https://vk.com/club1'].pos_widget)
+        self.assertIs(publics['https://vk.com/name1'].data, publics['https://vk.com/club1'].data)
+        self.assertEqual(answers['https://vk.com/name1']['public']['id'], 1)
+        self.assertEqual(answers['https://vk.com/name2']['public']['id'], 2)
+        counters = finder.metrics.to_dict()['counters']
+        self.assertEqual(counters['aliases'], 1)
+        self.assertEqual(counters['publics_handled'], 2)
+
+    def test_skips_duplicate_responses(self):
+        urls = ['https://vk.com/club3', 'https://vk.com/name3', 'https://vk.com/NAME3']
+        with create_finder(self.api) as finder:
+            answers = finder.check_urls(urls)
+
+        self.assertEqual(sorted(self.api.requests[0]), ['club3', 'name3'])
+        self.assertEqual([answer['public']['id'] for answer in answers.values()], [3, 3, 3])
+        counters = finder.metrics.to_dict()['counters']
+        self.assertEqual(counters['aliases'], 2)
+        self.assertEqual(counters['publics_handled'], 1)
+
+    def test_matches_screen_name_target_case_insensitive(self):
+        with create_finder(self.api) as finder:
+            answers = finder.check_urls(['https://vk.com/Name2'])
+
+        self.assertEqual(answers['https://vk.com/Name2']['public']['id'], 2)
+        self.assertNotEqual(answers['https://vk.com/Name2']['result'], 'ERROR')
+
+    def test_marks_unknown_publics_as_missing_data(self):
+        with create_finder(self.api) as finder:
+            answers = finder.check_urls(['https://vk.com/club1', 'https://vk.com/unknown'])
+
+        self.assertEqual(answers['https://vk.com/club1']['public']['id'], 1)
+        self.assertEqual(answers['https://vk.com/unknown']['public']['id'], '')
+
+    def test_writes_back_resolved_screen_names(self):
+        with tempfile.TemporaryDirectory() as directory:
+            ids_file = os.path.join(directory, 'ids.sqlite')
+            with create_finder(self.api, ids_file=ids_file) as finder:
+                finder.check_urls(['https://vk.com/club1', 'https://vk.com/Name1', 'https://vk.com/name2'])
+
+            resolver = IdsResolver(ids_file)
+            self.assertEqual(resolver.get_many(['name1', 'name2', 'name3']), dict(name1=1, name2=2))
+            resolver.close()
+
+            self.api.requests.clear()
+            with create_finder(self.api, ids_file=ids_file) as finder:
+                answers = finder.check_urls(['https://vk.com/club1', 'https://vk.com/name1', 'https://vk.com/name2'])
+
+            self.assertEqual(sorted(self.api.requests[0]), ['club1', 'club2'])
+            self.assertEqual(answers['https://vk.com/name1']['public']['id'], 1)
+            self.assertEqual(answers['https://vk.com/name2']['public']['id'], 2)
+            self.assertEqual(finder.metrics.to_dict()['counters']['aliases'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
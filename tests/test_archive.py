@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+import zlib
+
+from finder import PublicsArchive
+from tests.vk_api import get_group
+
+
+class PublicsArchiveTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'publics_archive.sqlite')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_restores_publics_after_reopen(self):
+        group = get_group(1, 'MyClub', city=dict(id=1, title='Москва'))
+        archive = PublicsArchive(self.path)
+        archive.put_many([group, get_group(2), dict(screen_name='no_id')])
+        archive.close()
+
+        archive = PublicsArchive(self.path)
+        result = archive.get_many(['club1', 'myclub', 'MYCLUB', 'public2', '2', 'no_id'])
+        raw = archive.get_many(['MyClub'], raw=True)
+        archive.close()
+
+        self.assertEqual(sorted(result), ['2', 'MYCLUB', 'club1', 'myclub', 'public2'])
+        self.assertEqual(result['MYCLUB'], group)
+        self.assertEqual(result['public2']['id'], 2)
+        self.assertIsInstance(raw['MyClub'], bytes)
+        self.assertIn('Москва', zlib.decompress(raw['MyClub']).decode('utf-8'))
+
+    def test_writes_all_queued_publics_on_close(self):
+        archive = PublicsArchive(self.path, queue_size=2)
+        for offset in range(0, 5000, 100):
+            archive.put_many(get_group(group_id) for group_id in range(offset + 1, offset + 101))
+        archive.put_many([get_group(1, 'renamed')])
+        archive.close()
+
+        archive = PublicsArchive(self.path)
+        self.assertEqual(archive.count(), 5000)
+        self.assertEqual([data['id'] for data in archive.iter_publics()], list(range(1, 5001)))
+        self.assertEqual(archive.get('club1')['screen_name'], 'renamed')
+        archive.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from finder import PublicsCache
+
+FIELDS = ['menu', 'city']
+
+
+class PublicsCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'publics_data.sqlite')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_finds_publics_by_ids_and_screen_names_in_any_case(self):
+        cache = PublicsCache(self.path, ttl=60, fields=FIELDS)
+        cache.put_many([dict(id=1, screen_name='MyClub'), dict(id=2, screen_name='other')])
+
+        result = cache.get_many(['club1', 'myclub', 'MyClub', 'OTHER', 'public2', 'missing'])
+        cache.close()
+
+        self.assertEqual(sorted(result), ['MyClub', 'OTHER', 'club1', 'myclub', 'public2'])
+        self.assertEqual(result['MyClub']['id'], 1)
+        self.assertEqual(result['public2']['id'], 2)
+
+    def test_looks_up_more_publics_than_one_query_takes(self):
+        cache = PublicsCache(self.path, ttl=60, fields=FIELDS)
+        cache.put_many(dict(id=group_id, screen_name=f'name{group_id}') for group_id in range(1, 1201))
+
+        result = cache.get_many([f'club{group_id}' for group_id in range(1, 1301)])
+        result.update(cache.get_many([f'NAME{group_id}' for group_id in range(1, 1301)]))
+        cache.close()
+
+        self.assertEqual(len(result), 2400)
+
+    def test_misses_publics_fetched_with_other_fields(self):
+        cache = PublicsCache(self.path, ttl=60, fields=FIELDS)
+        cache.put_many([dict(id=1, screen_name='club1')])
+        cache.close()
+
+        cache = PublicsCache(self.path, ttl=60, fields=['menu'])
+        self.assertEqual(cache.get_many(['club1']), {})
+        cache.close()
+
+    def test_deletes_expired_publics_on_open(self):
+        cache = PublicsCache(self.path, ttl=60, fields=FIELDS)
+        cache.put_many([dict(id=1, screen_name='old'), dict(id=2, screen_name='new')])
+        cache.close()
+        with sqlite3.connect(self.path) as connection:
+            connection.execute('UPDATE publics SET fetched_at = ? WHERE id = 1', (time.time() - 120,))
+
+        cache = PublicsCache(self.path, ttl=60, fields=FIELDS)
+        self.assertEqual(list(cache.get_many(['club1', 'club2'])), ['club2'])
+        cache.close()
+        with sqlite3.connect(self.path) as connection:
+            self.assertEqual(connection.execute('SELECT id FROM publics').fetchall(), [(2,)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+
+from finder import PosWidget
+from tests.vk_api import FakeVkApi, create_finder, get_group
+
+URLS = [f'https://vk.com/club{group_id}' for group_id in range(1, 1201)]
+
+
+class ExecuteTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.api = FakeVkApi([get_group(group_id) for group_id in range(1, 1201)], bad_ids=['club700'])
+
+    def test_splits_execute_response_into_batches(self):
+        with create_finder(self.api, execute_batch_size=25) as finder:
+            answers = finder.check_urls(URLS)
+
+        self.assertEqual(self.api.executes, [3])
+        self.assertEqual([len(request) for request in self.api.requests[:3]], [500, 500, 200])
+        self.assertEqual([answers[url]['public']['id'] for url in URLS if url != 'https://vk.com/club700'],
+                         [group_id for group_id in range(1, 1201) if group_id != 700])
+        errors = [url for url, answer in answers.items() if answer['result'] == PosWidget.ResultType.ERROR.name]
+        self.assertEqual(errors, ['https://vk.com/club700'])
+        fallback_ids = {identify for request in self.api.requests[3:] for identify in request}
+        self.assertEqual(fallback_ids, {f'club{group_id}' for group_id in range(501, 1001)})
+
+    def test_fetches_batches_with_plain_calls_when_disabled(self):
+        with create_finder(self.api, execute_batch_size=1) as finder:
+            answers = finder.check_urls(URLS)
+
+        self.assertEqual(self.api.executes, [])
+        self.assertEqual(self.api.requests[0], [f'club{group_id}' for group_id in range(1, 501)])
+        self.assertIn([f'club{group_id}' for group_id in range(1001, 1201)], self.api.requests)
+        self.assertEqual([answers[url]['public']['id'] for url in URLS if url != 'https://vk.com/club700'],
+                         [group_id for group_id in range(1, 1201) if group_id != 700])
+        self.assertEqual(answers['https://vk.com/club700']['result'], PosWidget.ResultType.ERROR.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+import unittest
+
+from finder import Public, RunJournal
+
+FIELDS = ('id', 'screen_name', 'name')
+
+
+def get_public(group_id: int) -> Public:
+    return Public(f'https://vk.com/club{group_id}').parse(dict(
+        id=group_id,
+        screen_name=f'club{group_id}',
+        name=f'Public {group_id}',
+        description='x' * 1000,
+        menu=dict(items=[dict(url='https://pos.gosuslugi.ru/form/?opaId=1')])
+    ))
+
+
+class RunJournalTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'journal.jsonl')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def write(self, *publics: Public) -> None:
+        journal = RunJournal(self.path, FIELDS)
+        journal.open()
+        journal.write_many(publics)
+        journal.close()
+
+    def test_keeps_only_stored_fields(self):
+        public = get_public(1)
+        self.write(public)
+        entry = RunJournal(self.path, FIELDS).load()['https://vk.com/club1']
+
+        self.assertEqual(entry['data'], dict(id=1, screen_name='club1', name='Public 1'))
+        restored = Public('https://vk.com/club1').restore(entry['data'], entry['pos_widget'])
+        self.assertIs(restored.pos_widget.result, public.pos_widget.result)
+        self.assertEqual(restored.pos_widget.to_dict(), public.pos_widget.to_dict())
+        self.assertEqual(restored.get_field_data('name'), 'Public 1')
+
+    def test_resume_skips_truncated_last_line(self):
+        self.write(get_public(1), get_public(2))
+        with open(self.path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(f'{lines[0]}\n{lines[1][:len(lines[1]) // 2]}')
+
+        journal = RunJournal(self.path, FIELDS)
+        self.assertEqual(list(journal.open(resume=True)), ['https://vk.com/club1'])
+        journal.write_many([get_public(2)])
+        journal.close()
+
+        with open(self.path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[2])['url'], 'https://vk.com/club2')
+        self.assertEqual(list(RunJournal(self.path, FIELDS).load()), ['https://vk.com/club1', 'https://vk.com/club2'])
+
+    def test_new_run_truncates_journal(self):
+        self.write(get_public(1))
+        journal = RunJournal(self.path, FIELDS)
+        self.assertEqual(journal.open(), {})
+        journal.close()
+        self.assertEqual(RunJournal(self.path, FIELDS).load(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import random
+import unittest
+
+from benchmarks.generator import generate_pos_url
+from finder.models import FormUrl, OgrnCode, OmsuUrl, OpaId, PosUrl, PosWidget, RegCode, UTMCode
+
+FORM_URL = 'https://pos.gosuslugi.ru/form/?opaId=123&utm_source=vk&utm_medium=12&utm_campaign=1234567890123'
+OMSU_URL = 'https://pos.gosuslugi.ru/og/org-activities?mun_code=12345678&utm_source=vk2&utm_medium=12&utm_campaign=1'
+
+
+class PosUrlDictTest(unittest.TestCase):
+    def assert_restored(self, pos_url: PosUrl) -> PosUrl:
+        restored = PosUrl.from_dict(pos_url.to_dict())
+        self.assertIs(type(restored), type(pos_url))
+        self.assertEqual(restored.to_dict(), pos_url.to_dict())
+        self.assertEqual(list(restored.utm_codes), list(pos_url.utm_codes))
+        for param, utm_code in pos_url.utm_codes.items():
+            self.assertIs(type(restored.utm_codes[param]), type(utm_code))
+            self.assertEqual(restored.utm_codes[param].hint, utm_code.hint)
+            self.assertEqual(restored.utm_codes[param].is_valid, utm_code.is_valid)
+        return restored
+
+    def test_restores_utm_code_types_and_hints(self):
+        restored = self.assert_restored(PosWidget.validate_pos_url(FORM_URL))
+        self.assertIs(restored.status_type, PosUrl.StatusType.VALID)
+        self.assertIsInstance(restored, FormUrl)
+        self.assertIsInstance(restored.utm_codes['opaId'], OpaId)
+        self.assertIsInstance(restored.utm_codes['utm_medium'], RegCode)
+        self.assertIsInstance(restored.utm_codes['utm_campaign'], OgrnCode)
+        self.assertEqual(restored.utm_codes['opaId'].hint, OpaId.RULE.hint)
+
+    def test_restores_invalid_and_undefined_utm_codes(self):
+        restored = self.assert_restored(PosWidget.validate_pos_url(f'{OMSU_URL}&extra=1'))
+        self.assertIsInstance(restored, OmsuUrl)
+        self.assertIs(restored.status_type, PosUrl.StatusType.UTM_INVALID)
+        self.assertFalse(restored.utm_codes['utm_campaign'].is_valid)
+        self.assertIs(type(restored.utm_codes['extra']), UTMCode)
+        self.assertEqual(restored.utm_codes['extra'].code, 'UNDEFINED')
+
+    def test_keeps_stored_pattern_of_changed_rules(self):
+        data = PosWidget.validate_pos_url(FORM_URL).to_dict()
+        data['utm_codes']['utm_campaign'][3] = r'\d{12}'
+        restored = PosUrl.from_dict(data)
+        self.assertIs(type(restored.utm_codes['utm_campaign']), UTMCode)
+        self.assertEqual(restored.utm_codes['utm_campaign'].pattern, r'\d{12}')
+
+
+class ValidateManyTest(unittest.TestCase):
+    def test_matches_validation_of_each_url(self):
+        rnd = random.Random(0)
+        urls = [generate_pos_url(rnd, group_id) for group_id in range(2000)]
+        urls += [
+            url.replace('/form/?', rnd.choice(['/form?', '/form/', '/x?'])) + rnd.choice(['', ' ', '&x=', '#x y'])
+            for url in urls[:500]
+        ]
+
+        statuses = PosWidget.validate_many(urls)
+        self.assertEqual(statuses, [PosWidget.validate_pos_url(url).status_type for url in urls])
+        self.assertGreater(len(set(statuses)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import contextlib
+import os
+import tempfile
+import unittest
+
+from configs import CONFIG
+from finder import PosWidget, Public, PublicsArchive, process_publics_offline
+from helpers import override
+from tests.vk_api import FakeVkApi, create_finder, get_group
+
+
+class OfflineTest(unittest.TestCase):
+    def setUp(self) -> None:
+        stack = contextlib.ExitStack()
+        self.addCleanup(stack.close)
+        directory = stack.enter_context(tempfile.TemporaryDirectory())
+        path = os.path.join(directory, 'publics_archive.sqlite')
+        stack.enter_context(override(CONFIG.paths, archive_file=path))
+        archive = PublicsArchive(path)
+        archive.put_many(get_group(group_id) for group_id in range(1, 1201))
+        archive.close()
+        self.urls = [f'https://vk.com/club{group_id}' for group_id in range(1, 1203)]
+
+    def check(self, processes: int) -> dict:
+        api = FakeVkApi([])
+        with create_finder(api) as finder:
+            finder.urls = set(self.urls)
+            finder.publics = {url: Public(url) for url in self.urls}
+            process_publics_offline(finder, processes)
+
+        self.assertEqual(api.requests, [])
+        self.assertEqual(finder.metrics.to_dict()['counters']['archive_misses'], 2)
+        return {url: public.pos_widget.result for url, public in finder.publics.items()}
+
+    def test_marks_publics_missing_from_archive_as_errors(self):
+        results = self.check(processes=1)
+        errors = [url for url, result in results.items() if result == PosWidget.ResultType.ERROR]
+        self.assertEqual(sorted(errors), ['https://vk.com/club1201', 'https://vk.com/club1202'])
+
+    def test_checks_archive_in_worker_processes(self):
+        self.assertEqual(self.check(processes=2), self.check(processes=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
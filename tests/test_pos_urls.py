@@ -0,0 +1,81 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+from benchmarks.generator import generate_pos_url
+from finder import PosUrl, PosUrlsCache, PosUrlsStore, PosWidget
+
+
+def get_urls(count: int) -> list:
+    rnd = random.Random(0)
+    return [generate_pos_url(rnd, group_id) for group_id in range(count)]
+
+
+class PosUrlsCacheTest(unittest.TestCase):
+    def test_evicts_least_recently_used_urls(self):
+        cache = PosUrlsCache(max_size=3)
+        for url in ['a', 'b', 'c']:
+            cache.put(url, PosWidget.validate_pos_url(url))
+        cache.get('a')
+        cache.put('d', PosWidget.validate_pos_url('d'))
+        cache.put('c', PosWidget.validate_pos_url('c'))
+        cache.put('e', PosWidget.validate_pos_url('e'))
+
+        self.assertEqual([url for url, _ in cache.items()], ['d', 'c', 'e'])
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_cached_validation_matches_uncached(self):
+        urls = get_urls(1000)
+        urls += urls[::3]
+        with mock.patch.object(PosWidget, 'POS_URLS_CACHE', None):
+            expected = [PosWidget().get_validated_pos_url(dict(url=url)).to_dict() for url in urls]
+
+        cache = PosUrlsCache(max_size=500)
+        with mock.patch.object(PosWidget, 'POS_URLS_CACHE', cache):
+            result = [PosWidget().get_validated_pos_url(dict(url=url)).to_dict() for url in urls]
+
+        self.assertEqual(result, expected)
+        self.assertGreater(cache.hits, 0)
+
+
+class PosUrlsStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'pos_urls.sqlite')
+        self.urls = get_urls(200)
+        self.cache = PosUrlsCache(max_size=500)
+        for url in self.urls:
+            self.cache.put(url, PosWidget.validate_pos_url(url))
+        store = PosUrlsStore(self.path)
+        store.save(self.cache)
+        store.close()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def load(self) -> PosUrlsCache:
+        cache = PosUrlsCache(max_size=500)
+        store = PosUrlsStore(self.path)
+        store.load(cache)
+        store.close()
+        return cache
+
+    def test_restores_saved_urls(self):
+        cache = self.load()
+        self.assertEqual(
+            [(url, pos_url.to_dict()) for url, pos_url in cache.items()],
+            [(url, pos_url.to_dict()) for url, pos_url in self.cache.items()]
+        )
+
+    def test_skips_urls_validated_by_other_rules(self):
+        with mock.patch.object(PosUrl, 'SPACERS_PATTERN', r'\s'):
+            cache = self.load()
+        self.assertNotEqual(cache.rules, self.cache.rules)
+        self.assertEqual(cache.count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
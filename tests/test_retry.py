@@ -0,0 +1,127 @@
+import threading
+import time
+import unittest
+
+from finder import PosWidget
+from helpers import Backoff, CircuitBreaker, CircuitOpenError
+from tests.vk_api import FakeVkApi, create_finder, get_group
+
+
+class BackoffTest(unittest.TestCase):
+    def test_doubles_delay_up_to_max(self):
+        backoff = Backoff(base=1., factor=2., max_delay=5., jitter=False)
+        self.assertEqual([backoff.get_delay(tries) for tries in range(1, 6)], [1., 2., 4., 5., 5.])
+
+    def test_jitter_keeps_delay_between_half_and_full(self):
+        backoff = Backoff(base=4., factor=2., max_delay=60., jitter=True)
+        for tries in range(1, 6):
+            delay = min(60., 4. * 2 ** (tries - 1))
+            for _ in range(50):
+                self.assertTrue(delay / 2 <= backoff.get_delay(tries) <= delay)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_opens_after_failures_in_a_row(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60.)
+        self.assertFalse(breaker.record_failure())
+        breaker.record_success()
+        self.assertFalse(breaker.record_failure())
+        self.assertFalse(breaker.record_failure())
+        self.assertFalse(breaker.is_open)
+
+        self.assertTrue(breaker.record_failure())
+        self.assertTrue(breaker.is_open)
+        self.assertFalse(breaker.record_failure())
+        with self.assertRaises(CircuitOpenError) as error:
+            breaker.check()
+        self.assertGreater(error.exception.remaining, 0)
+
+    def test_lets_one_probe_through_after_reset_timeout(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.)
+        breaker.record_failure()
+        breaker.check()
+        with self.assertRaises(CircuitOpenError):
+            breaker.check()
+
+        breaker.record_success()
+        self.assertFalse(breaker.is_open)
+        breaker.check()
+
+    def test_failed_probe_opens_circuit_again(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=.05)
+        breaker.record_failure()
+        time.sleep(.06)
+        breaker.check()
+        breaker.record_failure()
+
+        self.assertTrue(breaker.is_open)
+        with self.assertRaises(CircuitOpenError):
+            breaker.check()
+
+    def test_release_lets_next_probe_through(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.)
+        breaker.record_failure()
+        breaker.check()
+        breaker.release()
+        breaker.check()
+        self.assertTrue(breaker.is_open)
+
+    def test_waiting_callers_continue_after_probe_succeeds(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=.1)
+        breaker.record_failure()
+        probes = []
+
+        def call():
+            breaker.check(wait=True)
+            probes.append(breaker.is_open)
+            if breaker.is_open:
+                time.sleep(.05)
+                breaker.record_success()
+
+        started = time.monotonic()
+        threads = [threading.Thread(target=call) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertGreaterEqual(time.monotonic() - started, .1)
+        self.assertEqual(probes, [True, False, False, False, False])
+        self.assertFalse(breaker.is_open)
+
+
+class BisectionTest(unittest.TestCase):
+    def test_splits_batch_down_to_bad_id(self):
+        api = FakeVkApi([get_group(group_id) for group_id in range(1, 9)], bad_ids=['club6'])
+        with create_finder(api) as finder:
+            answers = finder.check_urls([f'https://vk.com/club{group_id}' for group_id in range(1, 9)])
+
+        self.assertEqual(answers['https://vk.com/club6']['result'], PosWidget.ResultType.ERROR.name)
+        self.assertTrue(all(
+            answer['result'] != PosWidget.ResultType.ERROR.name for url, answer in answers.items()
+            if url != 'https://vk.com/club6'
+        ))
+        self.assertIn(['club6'], api.requests)
+        self.assertEqual(len(api.requests), 7)
+        self.assertEqual(finder.metrics.to_dict()['counters']['bisections'], 3)
+
+    def test_does_not_split_on_connection_errors(self):
+        api = FakeVkApi([get_group(group_id) for group_id in range(1, 9)], connection_errors=100)
+        with create_finder(api) as finder:
+            answers = finder.check_urls([f'https://vk.com/club{group_id}' for group_id in range(1, 9)])
+
+        self.assertEqual({answer['result'] for answer in answers.values()}, {PosWidget.ResultType.TIMEOUT.name})
+        self.assertEqual(len(api.requests), 3)
+        self.assertNotIn('bisections', finder.metrics.to_dict()['counters'])
+
+    def test_does_not_split_on_flood_control(self):
+        api = FakeVkApi([get_group(group_id) for group_id in range(1, 9)], bad_ids=['club6'], error_code=9)
+        with create_finder(api) as finder:
+            answers = finder.check_urls([f'https://vk.com/club{group_id}' for group_id in range(1, 9)])
+
+        self.assertEqual({answer['result'] for answer in answers.values()}, {PosWidget.ResultType.TIMEOUT.name})
+        self.assertEqual(len(api.requests), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
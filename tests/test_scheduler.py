@@ -0,0 +1,108 @@
+import contextlib
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from configs import CONFIG
+from finder import ChecksDaemon, ChecksQueue, PosWidget, Public
+from helpers import override
+from tests.vk_api import FakeVkApi, create_finder, get_group
+
+INTERVALS = dict(CORRECT=3600, LINKS_COUNT=3600, MISSING=3600, INVALID=600, TIMEOUT=60, ERROR=60)
+
+
+def get_public(group_id: int, result: PosWidget.ResultType) -> Public:
+    public = Public(f'https://vk.com/club{group_id}').parse(get_group(group_id))
+    public.pos_widget.result = result
+    return public
+
+
+class ChecksQueueTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'queue.sqlite')
+        self.urls = [f'https://vk.com/club{group_id}' for group_id in range(1, 5)]
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_returns_due_publics_by_result_priority(self):
+        queue = ChecksQueue(self.path, INTERVALS, jitter=0.)
+        queue.sync(self.urls)
+        self.assertEqual(sorted(queue.get_due(10)), self.urls)
+
+        queue.put_results([
+            get_public(1, PosWidget.ResultType.CORRECT),
+            get_public(2, PosWidget.ResultType.ERROR),
+            get_public(3, PosWidget.ResultType.INVALID),
+        ], fields=['id', 'name'])
+        now = time.time()
+        first, second, third, fourth = self.urls
+
+        self.assertEqual(queue.next_due_at(), 0)
+        self.assertEqual(queue.get_due(10, now), [fourth])
+        self.assertEqual(queue.get_due(10, now + 60), [fourth, second])
+        self.assertEqual(queue.get_due(10, now + 600), [fourth, second, third])
+        self.assertEqual(queue.get_due(10, now + 3600), [fourth, second, third, first])
+        self.assertEqual(queue.get_due(2, now + 3600), [fourth, second])
+        queue.close()
+
+    def test_keeps_results_after_reopen(self):
+        queue = ChecksQueue(self.path, INTERVALS, jitter=0.)
+        queue.sync(self.urls)
+        queue.put_results([
+            get_public(1, PosWidget.ResultType.CORRECT),
+            get_public(2, PosWidget.ResultType.ERROR),
+        ], fields=['id', 'name'])
+        queue.close()
+
+        queue = ChecksQueue(self.path, INTERVALS, jitter=0.)
+        queue.sync(self.urls[1:])
+        publics = {public.url: public for public in queue.iter_publics()}
+        self.assertEqual(queue.count_results(), dict(ERROR=1, QUEUED=2))
+        self.assertEqual(list(publics), [self.urls[1]])
+        self.assertEqual(publics[self.urls[1]].pos_widget.result, PosWidget.ResultType.ERROR)
+        self.assertEqual(publics[self.urls[1]].data, dict(id=2, name='Public 2'))
+        self.assertEqual(sorted(queue.get_due(10, 0)), self.urls[2:])
+        queue.close()
+
+
+class ChecksDaemonTest(unittest.TestCase):
+    def test_checks_due_publics_and_saves_results(self):
+        api = FakeVkApi([get_group(group_id) for group_id in range(1, 4)], bad_ids=['club3'])
+        with contextlib.ExitStack() as stack:
+            directory = stack.enter_context(tempfile.TemporaryDirectory())
+            target_file = os.path.join(directory, 'target.txt')
+            with open(target_file, 'w', encoding='utf-8') as file:
+                file.write('\n'.join(f'https://vk.com/club{group_id}' for group_id in range(1, 4)))
+            stack.enter_context(override(
+                CONFIG.paths,
+                target_file=target_file,
+                queue_file=os.path.join(directory, 'queue.sqlite'),
+                result_file=os.path.join(directory, 'result.csv')
+            ))
+            stack.enter_context(override(CONFIG.metrics, enabled=False))
+            stack.enter_context(override(CONFIG.daemon, requests_per_day=86400000., intervals=INTERVALS, jitter=0.))
+            daemon = ChecksDaemon(stack.enter_context(create_finder(api)))
+
+            thread = threading.Thread(target=daemon.run)
+            thread.start()
+            deadline = time.monotonic() + 5
+            while sum(daemon.finder.counters.values()) < 3 and time.monotonic() < deadline:
+                time.sleep(.01)
+            daemon.stop()
+            thread.join(5)
+
+            queue = ChecksQueue(CONFIG.paths.queue_file, INTERVALS)
+            self.assertEqual(queue.count_results(), dict(LINKS_COUNT=2, ERROR=1))
+            queue.close()
+            self.assertTrue(os.path.exists(CONFIG.paths.result_file))
+            self.assertFalse(thread.is_alive())
+            counters = daemon.finder.counters
+            self.assertEqual((counters['LINKS_COUNT'], counters['ERROR']), (2, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import threading
+import time
+import unittest
+from typing import Dict, List
+
+from finder.service import AnswersCache, MicroBatcher
+
+
+class MicroBatcherTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.batches: List[List[str]] = []
+
+    def check(self, urls: List[str]) -> Dict[str, dict]:
+        self.batches.append(urls)
+        return {url: dict(url=url, result='CORRECT') for url in urls if url != 'missing'}
+
+    def start(self, batcher: MicroBatcher) -> threading.Thread:
+        thread = threading.Thread(target=batcher.run)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        self.addCleanup(batcher.stop)
+        return thread
+
+    def test_coalesces_concurrent_requests_into_one_batch(self):
+        batcher = MicroBatcher(self.check, batch_size=100, window=.2)
+        futures = []
+        threads = [
+            threading.Thread(target=lambda i=i: futures.extend(batcher.submit_many([f'url{i}', 'shared'])))
+            for i in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.start(batcher)
+
+        results = [future.result(timeout=5) for future in futures]
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(sorted(self.batches[0]), sorted(['shared', *(f'url{i}' for i in range(10))]))
+        self.assertEqual(sum(result['url'] == 'shared' for result in results), 10)
+
+    def test_splits_batches_by_size(self):
+        batcher = MicroBatcher(self.check, batch_size=3, window=.3)
+        futures = batcher.submit_many([f'url{i}' for i in range(7)])
+        started = time.monotonic()
+        self.start(batcher)
+
+        for future in futures:
+            future.result(timeout=5)
+        self.assertEqual([len(batch) for batch in self.batches], [3, 3, 1])
+        self.assertGreaterEqual(time.monotonic() - started, .25)
+
+    def test_fails_futures_of_unchecked_urls(self):
+        batcher = MicroBatcher(self.check, batch_size=10, window=0.)
+        futures = batcher.submit_many(['url', 'missing'])
+        self.start(batcher)
+
+        self.assertEqual(futures[0].result(timeout=5)['url'], 'url')
+        with self.assertRaises(KeyError):
+            futures[1].result(timeout=5)
+
+    def test_stop_cancels_pending_requests(self):
+        batcher = MicroBatcher(self.check, batch_size=10, window=60.)
+        futures = batcher.submit_many(['url'])
+        thread = self.start(batcher)
+        batcher.stop()
+        thread.join(5)
+
+        self.assertTrue(futures[0].cancelled())
+        self.assertEqual(self.batches, [])
+        with self.assertRaises(RuntimeError):
+            batcher.submit_many(['url'])
+
+
+class AnswersCacheTest(unittest.TestCase):
+    def test_expires_and_evicts_answers(self):
+        cache = AnswersCache(ttl=.05, max_size=2)
+        cache.put_many(dict(a=dict(result='A'), b=dict(result='B'), c=dict(result='C')))
+        self.assertEqual(cache.get_many(['a', 'b', 'c']), dict(b=dict(result='B'), c=dict(result='C')))
+
+        time.sleep(.06)
+        self.assertEqual(cache.get_many(['b', 'c']), {})
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
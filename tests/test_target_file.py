@@ -0,0 +1,53 @@
+import contextlib
+import os
+import tempfile
+import unittest
+
+from configs import CONFIG
+from helpers import override
+from tests.vk_api import FakeVkApi, create_finder
+
+
+class TargetFileTest(unittest.TestCase):
+    def setUp(self) -> None:
+        stack = contextlib.ExitStack()
+        self.addCleanup(stack.close)
+        directory = stack.enter_context(tempfile.TemporaryDirectory())
+        self.path = os.path.join(directory, 'target.txt')
+        stack.enter_context(override(CONFIG.paths, target_file=self.path))
+        self.finder = stack.enter_context(create_finder(FakeVkApi([])))
+
+    def write(self, text: str) -> None:
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(text)
+
+    def test_readers_skip_blank_lines(self):
+        self.write('\ufeffhttps://vk.com/club1\n\n   \nhttp://m.vk.com/club2 \nhttps://vk.com/club1\n')
+        urls = {'https://vk.com/club1', 'https://vk.com/club2'}
+
+        self.finder.read_urls_from_file()
+        self.assertEqual(self.finder.urls, urls)
+        self.assertEqual(list(self.finder.iter_urls_from_file(10)), [['https://vk.com/club1', 'https://vk.com/club2']])
+        self.assertEqual(self.finder.read_target_urls(), urls)
+
+    def test_readers_exit_on_file_without_links(self):
+        self.write('\n  \n')
+        for read in (self.finder.read_urls_from_file, lambda: self.finder.iter_urls_from_file(10)):
+            with self.assertRaises(SystemExit) as error:
+                read()
+            self.assertEqual(error.exception.code, 1)
+        self.assertIsNone(self.finder.read_target_urls())
+
+    def test_readers_exit_on_missing_file(self):
+        self.assertIsNone(self.finder.read_target_urls())
+        self.assertFalse(os.path.exists(self.path))
+        for read in (self.finder.read_urls_from_file, lambda: self.finder.iter_urls_from_file(10)):
+            with self.assertRaises(SystemExit) as error:
+                read()
+            self.assertEqual(error.exception.code, 2)
+            self.assertTrue(os.path.exists(self.path))
+            os.remove(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import os
+import tempfile
+import unittest
+
+from helpers import ROW_WRITERS, RowWriter, get_row_writer
+
+
+class RowWriterTest(unittest.TestCase):
+    def test_writer_without_write_rows_is_not_created(self):
+        class IncompleteRowWriter(RowWriter):
+            pass
+
+        with self.assertRaises(TypeError):
+            IncompleteRowWriter('result.txt')
+
+    def test_all_writers_are_concrete(self):
+        for file_format in ROW_WRITERS:
+            self.assertIsInstance(get_row_writer(file_format, f'result.{file_format}'), RowWriter)
+
+    def test_csv_writer_counts_rows(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'result.csv')
+            with get_row_writer('csv', path, delimiter=';').open(['url', 'pos_result']) as writer:
+                writer.write_rows([['https://vk.com/club1', 'CORRECT'], ['https://vk.com/club2', 'MISSING']])
+
+            self.assertEqual(writer.rows_count, 2)
+            with open(path, encoding='utf-16') as f:
+                self.assertEqual(f.read().splitlines(), [
+                    'url;pos_result', 'https://vk.com/club1;CORRECT', 'https://vk.com/club2;MISSING'
+                ])
+
+
+if __name__ == '__main__':
+    unittest.main()
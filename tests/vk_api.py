@@ -0,0 +1,95 @@
+import contextlib
+import json
+import re
+import threading
+from typing import Iterable, Iterator, List, Union
+
+from requests.exceptions import ConnectionError
+from vk.exceptions import VkAPIError
+
+from configs import CONFIG
+from helpers import TokenBucket, override
+from main import VkClient, WidgetFinder
+
+EXECUTE_CALL_REGEX = re.compile(r'API\.groups\.getById\((\{.*?\})\)')
+POS_URL = 'https://pos.gosuslugi.ru/form/?opaId={id}&utm_source=vk&utm_medium=77&utm_campaign=1234567890123'
+
+
+def get_group(group_id: int, screen_name: str = None, **data) -> dict:
+    return dict(
+        id=group_id,
+        name=f'Public {group_id}',
+        screen_name=screen_name or f'club{group_id}',
+        menu=dict(items=[dict(id=1, url=POS_URL.format(id=group_id), title='POS')]),
+        **data
+    )
+
+
+class FakeVkApi:
+    def __init__(
+            self,
+            groups: Iterable[dict],
+            bad_ids: Iterable[str] = (),
+            error_code: int = 100,
+            connection_errors: int = 0
+    ) -> None:
+        self.groups = {}
+        for group in groups:
+            for identify in (str(group['id']), f'club{group["id"]}', f'public{group["id"]}', group['screen_name']):
+                self.groups[identify.lower()] = group
+        self.bad_ids = set(bad_ids)
+        self.error_code = error_code
+        self.connection_errors = connection_errors
+        self.requests: List[List[str]] = []
+        self.executes: List[int] = []
+        self.__lock = threading.Lock()
+
+    def __call__(self, method: str):
+        return self.execute if method == 'execute' else self.get_by_id
+
+    def get_by_id(self, group_ids: str, fields: str = '') -> dict:
+        group_ids = group_ids.split(',')
+        with self.__lock:
+            self.requests.append(group_ids)
+            if self.connection_errors:
+                self.connection_errors -= 1
+                raise ConnectionError('Connection aborted')
+        if self.bad_ids.intersection(group_ids):
+            raise VkAPIError(dict(error_code=self.error_code, error_msg='Invalid group_ids', request_params=[]))
+        return dict(
+            groups=[self.groups[identify.lower()] for identify in group_ids if identify.lower() in self.groups],
+            profiles=[]
+        )
+
+    def execute(self, code: str) -> List[Union[dict, bool]]:
+        calls = EXECUTE_CALL_REGEX.findall(code)
+        with self.__lock:
+            self.executes.append(len(calls))
+        response = []
+        for params in calls:
+            try:
+                response.append(self.get_by_id(**json.loads(params)))
+            except VkAPIError:
+                response.append(False)
+        return response
+
+
+class FakeWidgetFinder(WidgetFinder):
+    def __init__(self, api: FakeVkApi) -> None:
+        self.fake_api = api
+        super().__init__()
+
+    def create_client(self, access_token: str) -> VkClient:
+        return VkClient(api=self.fake_api, rate_limiter=TokenBucket(rate=1000., capacity=1000.))
+
+
+@contextlib.contextmanager
+def create_finder(api: FakeVkApi, ids_file: str = None, **vk_api) -> Iterator[FakeWidgetFinder]:
+    with override(CONFIG.parsing, journal=False, incremental=False, save_public_data=False,
+                  resolve_ids=ids_file is not None), \
+            override(CONFIG.paths, ids_file=ids_file or CONFIG.paths.ids_file), \
+            override(CONFIG.cache, enabled=False), \
+            override(CONFIG.pos_urls_cache, persist=False), \
+            override(CONFIG.exceptions, connection=dict(max_tries=2, timeout=0, max_timeout=0, jitter=False)), \
+            override(CONFIG.vk_api, **{'access_tokens': ['token'], 'workers': 1, **vk_api}):
+        yield FakeWidgetFinder(api)